@@ -0,0 +1,43 @@
+"""Add users guests created_at index for the guest purge
+
+Revision ID: 0cd66a1515d0
+Revises: 450bc7564ea1
+Create Date: 2026-10-18 18:02:37.114826
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0cd66a1515d0"
+down_revision: Union[str, None] = "450bc7564ea1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_guests_created_at_id",
+            "users",
+            ["created_at", "id"],
+            postgresql_where=sa.text("role = 'guest'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_guests_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
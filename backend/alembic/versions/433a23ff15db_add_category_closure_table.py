@@ -0,0 +1,61 @@
+"""Add category closure table
+
+Revision ID: 433a23ff15db
+Revises: f1c3b7d2a946
+Create Date: 2026-10-18 16:41:09.274518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "433a23ff15db"
+down_revision: Union[str, None] = "f1c3b7d2a946"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "category_closure",
+        sa.Column("ancestor_id", sa.UUID(), nullable=False),
+        sa.Column("descendant_id", sa.UUID(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"], ["categories.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+
+    # Backfill from the existing categories, see src.categories.closure
+    op.execute(
+        """
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE closure (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM categories
+            UNION ALL
+            SELECT closure.ancestor_id, categories.id, closure.depth + 1
+            FROM closure
+            JOIN categories ON categories.parent_id = closure.descendant_id
+            WHERE closure.depth < 1000
+        )
+        SELECT ancestor_id, descendant_id, depth FROM closure
+        """
+    )
+    op.create_index(
+        "ix_category_closure_descendant_id",
+        "category_closure",
+        ["descendant_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_category_closure_descendant_id", table_name="category_closure")
+    op.drop_table("category_closure")
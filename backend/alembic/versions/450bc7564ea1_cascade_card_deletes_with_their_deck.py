@@ -0,0 +1,51 @@
+"""Cascade card deletes with their deck
+
+Revision ID: 450bc7564ea1
+Revises: 433a23ff15db
+Create Date: 2026-10-18 17:26:44.508139
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "450bc7564ea1"
+down_revision: Union[str, None] = "433a23ff15db"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT = "cards_deck_id_fkey"
+
+
+def replace_foreign_key(ondelete: Union[str, None]) -> None:
+    # Swapping the constraint locks cards and decks, but only briefly: it is
+    # added NOT VALID, so no rows are checked while the locks are held. Give
+    # up rather than queue the app's queries behind a long transaction.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.drop_constraint(CONSTRAINT, "cards", type_="foreignkey")
+    op.create_foreign_key(
+        CONSTRAINT,
+        "cards",
+        "decks",
+        ["deck_id"],
+        ["id"],
+        ondelete=ondelete,
+        postgresql_not_valid=True,
+    )
+
+    # Checking the existing rows doesn't block reads or writes, in a
+    # transaction of its own
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE cards VALIDATE CONSTRAINT {CONSTRAINT}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    replace_foreign_key(ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    replace_foreign_key(ondelete=None)
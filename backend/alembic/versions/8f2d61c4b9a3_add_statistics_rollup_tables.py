@@ -0,0 +1,101 @@
+"""Add statistics rollup tables
+
+Revision ID: 8f2d61c4b9a3
+Revises: 56dd6c609bb7
+Create Date: 2026-10-18 09:12:31.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f2d61c4b9a3"
+down_revision: Union[str, None] = "56dd6c609bb7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_day_statistics",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("succeeded", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("mature", sa.Integer(), nullable=False),
+        sa.Column("mature_succeeded", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    op.create_table(
+        "deck_review_statistics",
+        sa.Column("deck_id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("last_studied", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("recent_feedback", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("succeeded", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("mature", sa.Integer(), nullable=False),
+        sa.Column("mature_succeeded", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["deck_id"], ["decks.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("deck_id"),
+    )
+
+    # Backfill from the existing reviews, see src.statistics.rollups
+    op.execute(
+        """
+        INSERT INTO user_day_statistics
+            (user_id, day, total, succeeded, failed, mature, mature_succeeded)
+        SELECT
+            user_id,
+            (reviewed_at AT TIME ZONE 'UTC')::date,
+            count(*),
+            count(*) FILTER (WHERE feedback = 'ok'),
+            count(*) FILTER (WHERE feedback = 'forgot'),
+            count(*) FILTER (WHERE interval >= 21),
+            count(*) FILTER (WHERE interval >= 21 AND feedback = 'ok')
+        FROM reviews
+        GROUP BY user_id, (reviewed_at AT TIME ZONE 'UTC')::date
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO deck_review_statistics
+            (deck_id, user_id, total, succeeded, failed, mature, mature_succeeded,
+             last_studied, recent_feedback)
+        SELECT
+            reviews.deck_id,
+            reviews.user_id,
+            count(*),
+            count(*) FILTER (WHERE feedback = 'ok'),
+            count(*) FILTER (WHERE feedback = 'forgot'),
+            count(*) FILTER (WHERE interval >= 21),
+            count(*) FILTER (WHERE interval >= 21 AND feedback = 'ok'),
+            max(reviewed_at),
+            (array_agg(feedback ORDER BY reviewed_at DESC))[1:10]
+        FROM reviews
+        JOIN decks ON decks.id = reviews.deck_id
+        GROUP BY reviews.deck_id, reviews.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("deck_review_statistics")
+    op.drop_table("user_day_statistics")
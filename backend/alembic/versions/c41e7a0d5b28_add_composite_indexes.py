@@ -0,0 +1,70 @@
+"""Add composite indexes for review and card queries
+
+Revision ID: c41e7a0d5b28
+Revises: 8f2d61c4b9a3
+Create Date: 2026-10-18 10:02:47.130925
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7a0d5b28"
+down_revision: Union[str, None] = "8f2d61c4b9a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without blocking writes to the tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_reviews_card_id_reviewed_at",
+            "reviews",
+            ["card_id", sa.text("reviewed_at DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_reviews_user_id_reviewed_at",
+            "reviews",
+            ["user_id", "reviewed_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_cards_deck_id_next_review_date",
+            "cards",
+            ["deck_id", "next_review_date"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_decks_user_id_category_id",
+            "decks",
+            ["user_id", "category_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, table_name in [
+            ("ix_decks_user_id_category_id", "decks"),
+            ("ix_cards_deck_id_next_review_date", "cards"),
+            ("ix_reviews_user_id_reviewed_at", "reviews"),
+            ("ix_reviews_card_id_reviewed_at", "reviews"),
+        ]:
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
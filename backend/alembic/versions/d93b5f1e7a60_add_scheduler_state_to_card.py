@@ -0,0 +1,65 @@
+"""Add scheduler state to card
+
+Revision ID: d93b5f1e7a60
+Revises: c41e7a0d5b28
+Create Date: 2026-10-18 11:26:05.844312
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d93b5f1e7a60"
+down_revision: Union[str, None] = "c41e7a0d5b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "cards",
+        sa.Column("repetitions", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "cards",
+        sa.Column("ease_factor", sa.Float(), nullable=False, server_default="2.5"),
+    )
+    op.add_column(
+        "cards",
+        sa.Column("interval", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "cards",
+        sa.Column("last_reviewed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Backfill from the latest review of each card
+    op.execute(
+        """
+        UPDATE cards
+        SET repetitions = latest.repetitions,
+            ease_factor = latest.ease_factor,
+            interval = latest.interval,
+            last_reviewed_at = latest.reviewed_at
+        FROM (
+            SELECT DISTINCT ON (card_id)
+                card_id, repetitions, ease_factor, interval, reviewed_at
+            FROM reviews
+            ORDER BY card_id, reviewed_at DESC
+        ) AS latest
+        WHERE cards.id = latest.card_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("cards", "last_reviewed_at")
+    op.drop_column("cards", "interval")
+    op.drop_column("cards", "ease_factor")
+    op.drop_column("cards", "repetitions")
@@ -0,0 +1,42 @@
+"""Add users created_at index for keyset pagination
+
+Revision ID: e5a8c2f19b34
+Revises: d93b5f1e7a60
+Create Date: 2026-10-18 13:41:09.582214
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a8c2f19b34"
+down_revision: Union[str, None] = "d93b5f1e7a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            [sa.text("created_at DESC"), "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
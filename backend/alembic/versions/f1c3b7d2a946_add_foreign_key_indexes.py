@@ -0,0 +1,49 @@
+"""Add indexes for foreign key checks on user and category deletes
+
+Revision ID: f1c3b7d2a946
+Revises: e5a8c2f19b34
+Create Date: 2026-10-18 15:02:37.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c3b7d2a946"
+down_revision: Union[str, None] = "e5a8c2f19b34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_categories_user_id", "categories", ["user_id"]),
+    ("ix_categories_parent_id", "categories", ["parent_id"]),
+    ("ix_decks_category_id", "decks", ["category_id"]),
+    ("ix_deck_review_statistics_user_id", "deck_review_statistics", ["user_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,73 @@
+"""Time the auth dependency when the same access token is sent repeatedly.
+
+get_current_principal is called directly, without the app, for one signed-in
+user, with the verified token cache disabled and then enabled. The principal
+cache is warm both times, so no call queries the database and what is left
+is the cost of getting from the cookie to the principal.
+
+DATABASE_URL must point to a database that can be wiped, the user is loaded
+from it once.
+
+Usage: python scripts/benchmark-auth.py [--calls 100000]
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from fastapi import Response
+
+APP_DIR = "."
+
+
+def time_calls(get_principal, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        get_principal()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def run(calls: int):
+    from src.auth import jwt as auth_jwt
+    from src.auth.token_cache import VerifiedTokenCache
+    from src.db import SessionLocal, engine
+    from src.db.models import Base, User, UserRole
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db_session:
+        user = User(email="benchmark@domain.com", role=UserRole.USER)
+        user.save(db_session)
+        access_token = auth_jwt.create_access_token(user)
+
+        def get_principal():
+            return auth_jwt.get_current_principal(Response(), access_token, db_session)
+
+        for name, cache in [
+            ("without token cache", VerifiedTokenCache(maxsize=0)),
+            ("with token cache", VerifiedTokenCache()),
+        ]:
+            auth_jwt.token_cache = cache
+            # Loads the principal, and verifies the token once for the cache
+            get_principal()
+            micros = time_calls(get_principal, calls)
+            print(
+                f"{name:<20} {micros:6.2f}us per call "
+                f"({1_000_000 / micros:9.0f} calls/s), "
+                f"hit rate {cache.stats()['hit_rate']:.3f}"
+            )
+
+    Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+    logging.disable(logging.DEBUG)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    run(args.calls)
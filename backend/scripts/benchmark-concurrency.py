@@ -0,0 +1,199 @@
+"""Measure how GET /stats requests affect the latency of cheap endpoints.
+
+Cheap requests are timed on their own, then again while /stats is requested
+at a steady rate. Anything that blocks the event loop, like synchronous
+database I/O in an async def endpoint, delays every request waiting behind
+it and shows up in the p99 of the cheap ones.
+
+The app runs in-process. DATABASE_URL must point to a database that can be
+wiped. A local database answers so quickly that blocking on it hardly
+matters, so the connections go through a proxy that delays the database's
+replies by --db-latency-ms, like a database on another host would.
+
+Usage: python scripts/benchmark-concurrency.py [--db-latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+APP_DIR = "."
+CHEAP_REQUESTS = 200
+CHEAP_REQUEST_INTERVAL = 0.05
+
+
+def pipe(source: socket.socket, target: socket.socket, delay: float):
+    try:
+        while data := source.recv(65536):
+            time.sleep(delay)
+            target.sendall(data)
+    except OSError:
+        pass
+    finally:
+        target.close()
+
+
+def start_latency_proxy(host: str, port: int, delay: float) -> int:
+    """Forward local connections to host:port, delaying every reply"""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def accept():
+        while True:
+            client, _ = listener.accept()
+            server = socket.create_connection((host, port))
+            for args in [(client, server, 0), (server, client, delay)]:
+                threading.Thread(target=pipe, args=args, daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+def seed(engine, user_email: str, decks: int, reviews_per_deck: int):
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            text("SELECT id FROM users WHERE email = :email"), {"email": user_email}
+        ).scalar_one()
+        conn.execute(
+            text(
+                """
+                INSERT INTO decks (id, user_id, name, description, is_paused,
+                                   is_archived, created_at, updated_at)
+                SELECT gen_random_uuid(), :user_id, 'deck ' || i, '', false,
+                       false, now(), now()
+                FROM generate_series(1, :decks) AS i
+                """
+            ),
+            {"user_id": user_id, "decks": decks},
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO reviews (id, card_id, deck_id, user_id, reviewed_at,
+                                     card_content, deck_name, feedback, interval,
+                                     repetitions, ease_factor, created_at,
+                                     updated_at)
+                SELECT gen_random_uuid(), gen_random_uuid(), d.id, d.user_id,
+                       now() - (random() * 730) * interval '1 day', '', d.name,
+                       (ARRAY['ok', 'forgot', 'skipped'])[1 + (i % 3)],
+                       (random() * 60)::int, 1, 2.5, now(), now()
+                FROM decks d, generate_series(1, :reviews) AS i
+                """
+            ),
+            {"reviews": reviews_per_deck},
+        )
+
+
+async def time_cheap_requests(client, path: str):
+    """Latency from when each request was due, so time spent waiting for a
+    blocked event loop to get to it counts as well"""
+    latencies = []
+    start = time.perf_counter()
+    for i in range(CHEAP_REQUESTS):
+        due = start + i * CHEAP_REQUEST_INTERVAL
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        res = await client.get(path)
+        latencies.append((time.perf_counter() - due) * 1000)
+        assert res.status_code == 200, res.text
+    return latencies
+
+
+async def request_stats(client, latencies: list):
+    start = time.perf_counter()
+    res = await client.get("/stats")
+    latencies.append((time.perf_counter() - start) * 1000)
+    assert res.status_code == 200, res.text
+
+
+async def request_stats_until(client, rate: float, done: asyncio.Event, latencies):
+    """Start /stats requests at a fixed rate, whether or not earlier ones are
+    done, like independent clients would"""
+    requests = []
+    while not done.is_set():
+        requests.append(asyncio.create_task(request_stats(client, latencies)))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*requests)
+
+
+def report(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{name:<22} n={len(latencies):<5} mean={statistics.mean(latencies):8.2f}ms "
+        f"p50={p50:8.2f}ms p99={p99:8.2f}ms"
+    )
+
+
+async def run(decks: int, reviews_per_deck: int, stats_per_second: float):
+    from src.db import SessionLocal, engine
+    from src.db.models import Base
+    from src.main import app
+    from src.statistics.rollups import rebuild_statistics
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    credentials = {"email": "benchmark@domain.com", "password": "password"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://benchmark.local"
+    ) as client:
+        await client.post("/auth/register", json=credentials)
+        await client.post("/auth/login", json=credentials)
+
+        seed(engine, credentials["email"], decks, reviews_per_deck)
+        with SessionLocal() as db_session:
+            rebuild_statistics(db_session)
+
+        # Warm up both the sync and the async pools
+        await client.get("/stats")
+        await client.get("/me")
+
+        for path in ["/healthz", "/me"]:
+            report(f"{path} alone", await time_cheap_requests(client, path))
+
+            done = asyncio.Event()
+            stats_latencies = []
+            stats = asyncio.create_task(
+                request_stats_until(client, stats_per_second, done, stats_latencies)
+            )
+            cheap = await time_cheap_requests(client, path)
+            done.set()
+            await stats
+            report(f"{path} during /stats", cheap)
+            report("  /stats", stats_latencies)
+
+    Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decks", type=int, default=50)
+    parser.add_argument("--reviews-per-deck", type=int, default=2000)
+    parser.add_argument("--stats-per-second", type=float, default=5)
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    if args.db_latency_ms:
+        # The engines are created on import, so point them at the proxy first
+        url = make_url(os.environ["DATABASE_URL"])
+        proxy_port = start_latency_proxy(
+            url.host or "localhost", url.port or 5432, args.db_latency_ms / 1000
+        )
+        os.environ["DATABASE_URL"] = url.set(
+            host="127.0.0.1", port=proxy_port
+        ).render_as_string(hide_password=False)
+
+    asyncio.run(run(args.decks, args.reviews_per_deck, args.stats_per_second))
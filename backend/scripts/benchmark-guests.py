@@ -0,0 +1,88 @@
+"""Measure anonymous read throughput, and how many rows it inserts.
+
+Every request is made without cookies, like a crawler, an uptime probe or a
+first page load, so each one is handled as a new guest. The app runs
+in-process. DATABASE_URL must point to a database that can be wiped.
+
+Usage: python scripts/benchmark-guests.py [--requests 2000] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, select
+
+APP_DIR = "."
+PATHS = ["/decks", "/categories/tree", "/study/queue", "/me"]
+
+
+async def request_without_cookies(app, path: str, requests: int):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://benchmark.local"
+    ) as client:
+        for _ in range(requests):
+            client.cookies.clear()
+            res = await client.get(path)
+            assert res.status_code == 200, res.text
+
+
+async def run(requests: int, concurrency: int):
+    from src.db import async_engine, engine
+    from src.db.models import Base, User
+    from src.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    inserts = 0
+
+    def count_insert(conn, cursor, statement, *args):
+        nonlocal inserts
+        inserts += statement.lstrip().upper().startswith("INSERT")
+
+    # The admin user is added on startup
+    async with app.router.lifespan_context(app):
+        for path in PATHS:
+            inserts = 0
+            with engine.connect() as conn:
+                users_before = conn.scalar(select(func.count()).select_from(User))
+            for target in [engine, async_engine.sync_engine]:
+                event.listen(target, "before_cursor_execute", count_insert)
+
+            start = time.perf_counter()
+            await asyncio.gather(
+                *[
+                    request_without_cookies(app, path, requests // concurrency)
+                    for _ in range(concurrency)
+                ]
+            )
+            elapsed = time.perf_counter() - start
+
+            for target in [engine, async_engine.sync_engine]:
+                event.remove(target, "before_cursor_execute", count_insert)
+            with engine.connect() as conn:
+                users = conn.scalar(select(func.count()).select_from(User))
+
+            done = requests // concurrency * concurrency
+            print(
+                f"{path:<18} {done / elapsed:8.0f} req/s  inserts={inserts:<6} "
+                f"new users={users - users_before}"
+            )
+
+    Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests, args.concurrency))
@@ -0,0 +1,126 @@
+"""Measure login throughput, and what a burst of logins does to other requests.
+
+--logins logins are sent at once, one client per user, while a signed-in
+client requests GET /decks at a steady rate. Logins rejected with a 503 are
+counted, not retried. The app runs in-process. DATABASE_URL must point to a
+database that can be wiped. BCRYPT_ROUNDS sets the cost, as in the app.
+
+Usage: python scripts/benchmark-logins.py [--logins 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import bcrypt
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+APP_DIR = "."
+CHEAP_REQUEST_INTERVAL = 0.05
+PASSWORD = "password"
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+
+def make_client(app) -> AsyncClient:
+    # Errors, like running out of database connections, come back as a 500
+    return AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://benchmark.local",
+    )
+
+
+async def log_in(app, email: str, statuses: Counter):
+    async with make_client(app) as client:
+        res = await client.post(
+            "/auth/login", json={"email": email, "password": PASSWORD}
+        )
+        statuses[res.status_code] += 1
+
+
+async def time_cheap_requests(client, done: asyncio.Event):
+    """Latency from when each request was due, as in benchmark-concurrency"""
+    latencies = []
+    start = time.perf_counter()
+    while not done.is_set():
+        due = start + len(latencies) * CHEAP_REQUEST_INTERVAL
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        res = await client.get("/decks")
+        latencies.append((time.perf_counter() - due) * 1000)
+        assert res.status_code == 200, res.text
+    return latencies
+
+
+async def run(logins: int):
+    from src.db import engine
+    from src.db.models import Base
+    from src.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    # One hash for everyone, hashing per user would take as long as the run
+    password_hash = bcrypt.hashpw(
+        PASSWORD.encode("utf-8"), bcrypt.gensalt(BCRYPT_ROUNDS)
+    ).decode("utf-8")
+    emails = [f"user{i}@domain.com" for i in range(logins + 1)]
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO users (id, email, password_hash, role, auth_provider,
+                                   token_version, created_at, updated_at)
+                SELECT gen_random_uuid(), email, :password_hash, 'user',
+                       'password', 0, now(), now()
+                FROM unnest(CAST(:emails AS text[])) AS email
+                """
+            ),
+            {"password_hash": password_hash, "emails": emails},
+        )
+
+    async with make_client(app) as client:
+        res = await client.post(
+            "/auth/login", json={"email": emails[-1], "password": PASSWORD}
+        )
+        assert res.status_code == 204, res.text
+
+        done = asyncio.Event()
+        cheap = asyncio.create_task(time_cheap_requests(client, done))
+        await asyncio.sleep(0.5)
+
+        statuses = Counter()
+        start = time.perf_counter()
+        await asyncio.gather(*[log_in(app, email, statuses) for email in emails[:-1]])
+        elapsed = time.perf_counter() - start
+
+        done.set()
+        latencies = sorted(await cheap)
+
+    Base.metadata.drop_all(bind=engine)
+
+    print(f"bcrypt rounds:      {BCRYPT_ROUNDS}")
+    print(f"logins:             {logins} in {elapsed:.2f}s, statuses {dict(statuses)}")
+    print(f"successful logins:  {statuses[204] / elapsed:.1f}/s")
+    print(
+        f"GET /decks:         n={len(latencies)} "
+        f"mean={statistics.mean(latencies):.1f}ms "
+        f"p50={latencies[len(latencies) // 2]:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)]:.1f}ms "
+        f"max={latencies[-1]:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins))
@@ -0,0 +1,76 @@
+"""Measure the latency of POST /reviews against a scratch database.
+
+The app runs in-process, so the numbers are request handling plus database
+round trips. DATABASE_URL must point to a database that can be wiped.
+
+Usage: python scripts/benchmark-reviews.py [--reviews 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+APP_DIR = "."
+
+
+async def run(reviews: int):
+    from src.db import engine
+    from src.db.models import Base
+    from src.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://benchmark.local"
+    ) as client:
+        credentials = {"email": "benchmark@domain.com", "password": "password"}
+        await client.post("/auth/register", json=credentials)
+        await client.post("/auth/login", json=credentials)
+
+        res = await client.post("/decks", json={"name": "benchmark"})
+        deck_id = res.json()["id"]
+        res = await client.post("/cards", json={"deck_id": deck_id, "content": "x"})
+        card_id = res.json()["id"]
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        latencies = []
+        for i in range(reviews):
+            feedback = "forgot" if i % 4 == 0 else "ok"
+            start = time.perf_counter()
+            res = await client.post(
+                "/reviews", json={"card_id": card_id, "feedback": feedback}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert res.status_code == 201, res.text
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    Base.metadata.drop_all(bind=engine)
+
+    latencies.sort()
+    print(f"reviews:            {reviews}")
+    print(f"statements/review:  {statements / reviews:.1f}")
+    print(f"mean:               {statistics.mean(latencies):.2f}ms")
+    print(f"p50:                {latencies[len(latencies) // 2]:.2f}ms")
+    print(f"p95:                {latencies[int(len(latencies) * 0.95)]:.2f}ms")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.reviews))
@@ -0,0 +1,79 @@
+"""Compare per-deck filtering with a single partition pass in src.statistics.
+
+Usage: python scripts/benchmark-statistics.py [--reviews 200000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+APP_DIR = "."
+DECK_COUNTS = [50, 100, 250, 500]
+
+
+@dataclass
+class BenchmarkReview:
+    deck_id: UUID
+    feedback: str
+    interval: int
+    reviewed_at: datetime
+
+    @property
+    def succeeded(self):
+        return self.feedback == "ok"
+
+    @property
+    def failed(self):
+        return self.feedback == "forgot"
+
+
+def make_reviews(decks, count):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        BenchmarkReview(
+            deck_id=random.choice(decks).id,
+            feedback=random.choice(["ok", "forgot", "skipped"]),
+            interval=random.randint(1, 60),
+            reviewed_at=start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def per_deck_filter(decks, reviews):
+    return [
+        get_deck_statistics(
+            deck, [review for review in reviews if review.deck_id == deck.id]
+        )
+        for deck in decks
+    ]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, APP_DIR)
+    from src.statistics import get_deck_statistics, get_decks_statistics
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'decks':>6} {'per-deck filter':>16} {'partitioned':>12}")
+    for deck_count in DECK_COUNTS:
+        decks = [
+            SimpleNamespace(id=uuid4(), name=f"deck {i}") for i in range(deck_count)
+        ]
+        reviews = make_reviews(decks, args.reviews)
+        baseline = timed(per_deck_filter, decks, reviews)
+        partitioned = timed(get_decks_statistics, decks, reviews)
+        print(f"{deck_count:>6} {baseline:>15.3f}s {partitioned:>11.3f}s")
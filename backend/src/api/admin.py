@@ -1,21 +1,34 @@
+from typing import Dict
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from src.auth.jwt import get_current_user
-from src.db import get_db
+from src.auth.jwt import get_current_principal
+from src.auth.principal import Principal
+from src.auth.token_cache import token_cache
+from src.db import get_db, get_pool_stats
 from src.db.models import User, UserRole
 from src.pagination import PaginationService, get_pagination_params
-from src.schemas.pagination import PaginatedResponse, PaginationParams
+from src.schemas.auth import TokenCacheStats
+from src.schemas.db import PoolStats
+from src.schemas.pagination import (
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    PaginationParams,
+)
 from src.schemas.user import UserOut
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-@router.get("/users", response_model=PaginatedResponse[UserOut])
+@router.get(
+    "/users",
+    response_model=PaginatedResponse[UserOut] | CursorPaginatedResponse[UserOut],
+)
 def get_users(
     show_guests: bool = False,
     pagination: PaginationParams = Depends(get_pagination_params),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     pagination_service = PaginationService(db_session)
@@ -23,13 +36,34 @@ def get_users(
     if not user.is_admin:
         raise HTTPException(status_code=403)
 
-    query = db_session.query(User).order_by(User.created_at.desc(), User.id)
+    query = db_session.query(User)
 
     if not show_guests:
         query = query.filter(User.role != UserRole.GUEST)
 
-    return pagination_service.paginate(
-        query=query,
-        page=pagination.page,
-        size=pagination.size,
-    )
+    try:
+        return pagination_service.paginate_params(
+            query=query,
+            order_by=[User.created_at.desc(), User.id],
+            pagination=pagination,
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+
+@router.get("/db/pool", response_model=Dict[str, PoolStats])
+def get_db_pool_stats(user: Principal = Depends(get_current_principal)):
+    """Connection pool usage of the sync and async engines since startup"""
+    if not user.is_admin:
+        raise HTTPException(status_code=403)
+
+    return get_pool_stats()
+
+
+@router.get("/auth/token-cache", response_model=TokenCacheStats)
+def get_token_cache_stats(user: Principal = Depends(get_current_principal)):
+    """Hit rate of the verified token cache since startup"""
+    if not user.is_admin:
+        raise HTTPException(status_code=403)
+
+    return token_cache.stats()
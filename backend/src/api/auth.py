@@ -1,9 +1,10 @@
 import logging
 
-import bcrypt
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src import util
@@ -13,8 +14,10 @@ from src.auth.jwt import (
     decode_jwt,
     get_access_token_cookie_kwargs,
     get_refresh_token_cookie_kwargs,
+    guest_user_from_claims,
 )
-from src.db import get_db
+from src.auth.passwords import check_password_async, hash_password_async, needs_rehash
+from src.db import get_async_db, get_db
 from src.db.models import User, UserRole
 from src.exceptions import RefreshTokenAuthenticationError
 from src.schemas.user import UserCreate, UserLogin, UserOut
@@ -23,10 +26,12 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", status_code=204)
-def login(
-    user_req: UserLogin, response: Response, db_session: Session = Depends(get_db)
+async def login(
+    user_req: UserLogin,
+    response: Response,
+    db_session: AsyncSession = Depends(get_async_db),
 ):
-    user = User.filter_by(db_session, email=user_req.email).first()
+    user = (await User.filter_by_async(db_session, email=user_req.email)).first()
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
@@ -40,11 +45,17 @@ def login(
             detail=f"This account was created via {auth_provider.title()}. Please use that provider to sign in.",
         )
 
-    pw_bytes = user_req.password.encode("utf-8")
-    pw_hashed = user.password_hash.encode("utf-8")
-    if not bcrypt.checkpw(pw_bytes, pw_hashed):
+    # Return the connection to the pool instead of holding it while bcrypt runs
+    await db_session.commit()
+
+    if not await check_password_async(user_req.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
+    # Bring the hash up to the current cost while the password is at hand
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(user_req.password)
+        await db_session.commit()
+
     logging.info(f"User {user.email} logged in")
 
     access_token = create_access_token(user)
@@ -62,24 +73,39 @@ def logout(response: Response):
     return
 
 
+async def save_registered_user(db_session: AsyncSession, user: User):
+    # The email is checked before hashing the password, a concurrent
+    # registration can take it in between
+    try:
+        await user.save_async(db_session)
+    except IntegrityError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail="Email is in use")
+
+
 @router.post("/register", response_model=UserOut, status_code=201)
-def register(
-    user_req: UserCreate, request: Request, db_session: Session = Depends(get_db)
+async def register(
+    user_req: UserCreate,
+    request: Request,
+    db_session: AsyncSession = Depends(get_async_db),
 ):
-    if User.filter_by(db_session, email=user_req.email).first():
+    if (await User.filter_by_async(db_session, email=user_req.email)).first():
         raise HTTPException(status_code=400, detail="Email is in use")
+    await db_session.commit()
+
+    password_hash = await hash_password_async(user_req.password)
 
-    user = util.get_user_from_token(request, db_session)
+    user = await util.get_user_from_token_async(request, db_session)
     if user and user.role == UserRole.GUEST:
-        user.promote_to_user(user_req.email, user_req.password)
-        user.save(db_session)
+        user.promote_to_user(user_req.email)
+        user.password_hash = password_hash
+        await save_registered_user(db_session, user)
 
         logging.info(f"Promoted guest user to {user.email}")
         return user
 
-    user = User(email=user_req.email, role=UserRole.USER)
-    user.set_password(user_req.password)
-    user.save(db_session)
+    user = User(email=user_req.email, role=UserRole.USER, password_hash=password_hash)
+    await save_registered_user(db_session, user)
 
     logging.info(f"Created user {user.email}")
     return user
@@ -101,7 +127,7 @@ def refresh_token(
         token_version = payload.get("token_version")
         if user_id is None or token_version is None:
             raise RefreshTokenAuthenticationError("Invalid refresh token")
-        user = User.get(db_session, user_id)
+        user = User.get(db_session, user_id) or guest_user_from_claims(payload)
         if not user or user.token_version != token_version:
             raise RefreshTokenAuthenticationError("Invalid refresh token")
     except jwt.ExpiredSignatureError:
@@ -1,14 +1,24 @@
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, contains_eager
 
-from src.auth.jwt import get_current_user
+from src.auth.jwt import get_current_principal
+from src.auth.principal import Principal
+from src.const import CARDS_STREAM_BATCH_SIZE
 from src.db import get_db
-from src.db.models import Card, Deck, User
-from src.schemas.card import CardCreate, CardOut, CardUpdate
+from src.db.models import Card, Deck
+from src.db.routing import get_read_db
+from src.pagination import PaginationService, get_optional_pagination_params
+from src.schemas.card import CardCreate, CardOrder, CardOut, CardUpdate
+from src.schemas.pagination import (
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    PaginationParams,
+)
 from src.util import get_user_card, get_user_deck
 
 router = APIRouter(prefix="/cards", tags=["cards"])
@@ -17,7 +27,7 @@ router = APIRouter(prefix="/cards", tags=["cards"])
 @router.post("", response_model=CardOut, status_code=201)
 def create_card(
     card_req: CardCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     try:
@@ -31,14 +41,56 @@ def create_card(
     return CardOut.from_card(card)
 
 
-@router.get("", response_model=List[CardOut])
+CARD_ORDER_BY = {
+    CardOrder.NEXT_REVIEW_DATE: [Card.next_review_date, Card.id],
+    CardOrder.CREATED_AT: [Card.created_at.desc(), Card.id],
+}
+
+
+def stream_cards(query, db_session: Session):
+    """Serialize cards as NDJSON while the server-side cursor yields them"""
+    try:
+        # Legacy Query uniquifies rows with eager loaded joins, which can't be
+        # combined with yield_per, so run the statement directly
+        cards = db_session.scalars(
+            query.statement.execution_options(yield_per=CARDS_STREAM_BATCH_SIZE)
+        )
+        for card in cards:
+            yield CardOut.from_card(card).model_dump_json() + "\n"
+    finally:
+        # The request's session may already be closed by now, iterating has
+        # opened a new transaction that has to be released
+        db_session.close()
+
+
+@router.get(
+    "",
+    response_model=List[CardOut]
+    | PaginatedResponse[CardOut]
+    | CursorPaginatedResponse[CardOut],
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                    "example": '{"id": "..."}\n{"id": "..."}\n',
+                }
+            },
+            "description": "All cards, or a page of cards if a page or cursor is "
+            "given. With stream=true, one JSON card per line.",
+        }
+    },
+)
 def get_cards(
     deck_id: UUID = None,
     only_due: bool = False,
     exclude_paused: bool = False,
     exclude_archived: bool = False,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    order_by: Optional[CardOrder] = None,
+    stream: bool = Query(False, description="Stream every card as NDJSON"),
+    pagination: Optional[PaginationParams] = Depends(get_optional_pagination_params),
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
     query = (
         db_session.query(Card)
@@ -57,21 +109,35 @@ def get_cards(
         query = query.filter(Deck.is_archived == False)
 
     if only_due:
-        query = query.filter(
-            Card.next_review_date <= datetime.now(timezone.utc)
-        ).order_by(Card.next_review_date)
-    else:
-        query = query.order_by(Card.created_at.desc())
+        query = query.filter(Card.next_review_date <= datetime.now(timezone.utc))
+
+    if order_by is None:
+        order_by = CardOrder.NEXT_REVIEW_DATE if only_due else CardOrder.CREATED_AT
+
+    if pagination and not stream:
+        try:
+            page = PaginationService(db_session).paginate_params(
+                query, CARD_ORDER_BY[order_by], pagination
+            )
+        except ValueError as err:
+            raise HTTPException(status_code=400, detail=str(err))
+        page.items = [CardOut.from_card(card) for card in page.items]
+        return page
+
+    query = query.order_by(*CARD_ORDER_BY[order_by])
+    if stream:
+        return StreamingResponse(
+            stream_cards(query, db_session), media_type="application/x-ndjson"
+        )
 
-    cards = query.all()
-    return [CardOut.from_card(card) for card in cards]
+    return [CardOut.from_card(card) for card in query.all()]
 
 
 @router.patch("/{card_id}", response_model=CardOut)
 def update_card(
     card_id: UUID,
     card_req: CardUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     try:
@@ -89,7 +155,7 @@ def update_card(
 @router.delete("/{card_id}")
 def delete_card(
     card_id: UUID,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     try:
@@ -2,28 +2,50 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
-from src.auth.jwt import get_current_user
+from src.auth.jwt import get_current_principal, get_current_principal_for_write
+from src.auth.principal import Principal
+from src.categories.closure import (
+    add_to_closure,
+    move_in_closure,
+    remove_from_closure,
+)
+from src.categories.hierarchy import forest_cte, get_path, would_create_cycle
+from src.categories.tree import build_category_tree
 from src.db import get_db
-from src.db.models import Category, Deck, User
+from src.db.models import Category, Deck
+from src.db.routing import get_read_db
 from src.schemas.category import (
     CategoryCreate,
-    CategoryNode,
     CategoryOut,
     CategoryTree,
     CategoryUpdate,
-    DeckSummary,
 )
-from src.util import get_depth_to_root, get_user_category, would_create_cycle
+from src.util import get_user_category
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
+def to_category_out(category: Category, path: List[str]) -> CategoryOut:
+    return CategoryOut(
+        id=category.id,
+        user_id=category.user_id,
+        name=category.name,
+        description=category.description,
+        parent_id=category.parent_id,
+        is_root=category.is_root,
+        path=path,
+        created_at=category.created_at,
+        updated_at=category.updated_at,
+    )
+
+
 @router.post("", response_model=CategoryOut, status_code=201)
 def create_category(
     category_req: CategoryCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal_for_write),
     db_session: Session = Depends(get_db),
 ):
     if category_req.parent_id:
@@ -38,80 +60,50 @@ def create_category(
         description=category_req.description,
         parent_id=category_req.parent_id,
     )
-    category.save(db_session)
-    return category
+    category.save(db_session, commit=False)
+    add_to_closure(db_session, category.id, category.parent_id)
+    db_session.commit()
+    return to_category_out(category, get_path(db_session, category.id))
 
 
 @router.get("", response_model=List[CategoryOut])
 def get_categories(
-    user: User = Depends(get_current_user), db_session: Session = Depends(get_db)
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
-    query = (
-        db_session.query(Category)
-        .filter(Category.user_id == user.id)
+    forest = forest_cte(user.id)
+    rows = db_session.execute(
+        select(Category, forest.c.path)
+        .outerjoin(forest, forest.c.id == Category.id)
+        .where(Category.user_id == user.id)
         .order_by(Category.name)
-    )
+    ).all()
 
-    return query.all()
+    # Only a category in a cycle can't be reached from a root
+    return [
+        to_category_out(category, path or [category.name]) for category, path in rows
+    ]
 
 
-@router.get("/tree", response_model=CategoryTree)
+@router.get("/tree", response_model=CategoryTree, response_model_exclude_none=True)
 def get_categories_tree(
-    user: User = Depends(get_current_user), db_session: Session = Depends(get_db)
+    include_counts: bool = False,
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
-    categories = (
-        Category.filter_by(db_session, user_id=user.id).order_by(Category.name).all()
-    )
-    uncategorized_decks = (
-        Deck.filter_by(db_session, user_id=user.id, category_id=None)
-        .order_by(Deck.name)
-        .all()
-    )
+    """The user's categories as a tree, with their decks.
 
-    category_map = {cat.id: cat for cat in categories}
-    root_categories = []
-    tree_depth = 0
-
-    def build_node(category: Category) -> CategoryNode:
-        decks = [DeckSummary(id=deck.id, name=deck.name) for deck in category.decks]
-        node_depth = get_depth_to_root(category) + 1
-        nonlocal tree_depth
-        tree_depth = max(tree_depth, node_depth)
-        children = [
-            build_node(category_map[child.id])
-            for child in categories
-            if child.parent_id == category.id
-        ]
-
-        return CategoryNode(
-            id=category.id,
-            name=category.name,
-            decks=sorted(decks, key=lambda d: d.name),
-            children=sorted(children, key=lambda c: c.name),
-            deck_count=len(decks),
-            depth=node_depth,
-        )
-
-    for category in categories:
-        if category.parent_id is None:
-            root_categories.append(build_node(category))
-
-    return CategoryTree(
-        categories=root_categories,
-        uncategorized_decks=[
-            DeckSummary(id=deck.id, name=deck.name) for deck in uncategorized_decks
-        ],
-        total_categories=len(categories),
-        total_decks=sum([len(c.decks) for c in categories]) + len(uncategorized_decks),
-        tree_depth=tree_depth,
-    )
+    With include_counts, every deck and category has a card_count and a
+    due_count, a category's including those of its descendants.
+    """
+    return build_category_tree(db_session, user.id, include_counts)
 
 
 @router.patch("/{category_id}", response_model=CategoryOut)
 def update_category(
     category_id: UUID,
     category_req: CategoryUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     try:
@@ -127,7 +119,7 @@ def update_category(
         except ValueError as err:
             raise HTTPException(status_code=404, detail=str(err))
 
-        if would_create_cycle(category.id, parent_category):
+        if would_create_cycle(db_session, category.id, parent_category.id):
             raise HTTPException(
                 status_code=400, detail="Would create circular reference"
             )
@@ -138,50 +130,69 @@ def update_category(
         )
 
     updates = category_req.model_dump(exclude_unset=True)
+    moved = "parent_id" in updates and updates["parent_id"] != category.parent_id
     for field, value in updates.items():
         setattr(category, field, value)
-    category.save(db_session)
-    return category
+    category.save(db_session, commit=False)
+    if moved:
+        move_in_closure(db_session, category.id, category.parent_id)
+    db_session.commit()
+    return to_category_out(category, get_path(db_session, category.id))
 
 
 @router.delete("/{category_id}")
 def delete_category(
     category_id: UUID,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
-    try:
-        category = get_user_category(category_id, user.id, db_session)
-    except ValueError as err:
-        raise HTTPException(status_code=404, detail=str(err))
+    category = db_session.execute(
+        select(Category.parent_id).where(
+            Category.id == category_id, Category.user_id == user.id
+        )
+    ).first()
+    if not category:
+        raise HTTPException(
+            status_code=404, detail="Category not found or access denied"
+        )
 
+    # Children and decks move up to the parent, without loading any of them
     try:
-        for child in category.children:
-            child.parent_id = category.parent_id
-            db_session.add(child)
-
-        for deck in category.decks:
-            deck.category_id = category.parent_id
-            db_session.add(deck)
-
+        db_session.execute(
+            update(Category)
+            .where(Category.parent_id == category_id)
+            .values(parent_id=category.parent_id)
+            .execution_options(synchronize_session=False)
+        )
+        db_session.execute(
+            update(Deck)
+            .where(Deck.category_id == category_id)
+            .values(category_id=category.parent_id)
+            .execution_options(synchronize_session=False)
+        )
+        remove_from_closure(db_session, category_id)
+        db_session.execute(
+            delete(Category)
+            .where(Category.id == category_id)
+            .execution_options(synchronize_session=False)
+        )
         db_session.commit()
-
-        category.delete(db_session)
-        return {"id": category.id}
     except Exception:
         db_session.rollback()
         raise
 
+    return {"id": category_id}
+
 
 @router.get("/{category_id}", response_model=CategoryOut)
 def get_category(
     category_id: UUID,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
     try:
         category = get_user_category(category_id, user.id, db_session)
     except ValueError as err:
         raise HTTPException(status_code=404, detail=str(err))
 
-    return category
+    return to_category_out(category, get_path(db_session, category.id))
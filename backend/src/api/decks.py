@@ -1,14 +1,20 @@
+from datetime import datetime, timezone
 from io import BytesIO
 from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
-from src.auth.jwt import get_current_user
+from src.auth.jwt import get_current_principal, get_current_principal_for_write
+from src.auth.principal import Principal
+from src.categories.closure import subtree_ids
 from src.db import get_db
-from src.db.models import Deck, User
+from src.db.models import Card, Deck
+from src.db.routing import get_read_db
+from src.decks.counts import deck_counts_columns, deck_counts_from_row
 from src.import_export import (
     BaseImporter,
     deck_to_deck_data,
@@ -16,7 +22,7 @@ from src.import_export import (
     store_imported_deck,
 )
 from src.import_export.custom import CustomImporter
-from src.schemas.deck import DeckCreate, DeckOut, DeckUpdate
+from src.schemas.deck import DeckCreate, DeckOut, DeckUpdate, DeckWithCountsOut
 from src.util import get_user_category, get_user_deck
 
 router = APIRouter(prefix="/decks", tags=["decks"])
@@ -25,8 +31,8 @@ router = APIRouter(prefix="/decks", tags=["decks"])
 @router.get("/{deck_id}", response_model=DeckOut)
 def get_deck(
     deck_id: UUID = None,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
     try:
         deck = get_user_deck(deck_id, user.id, db_session)
@@ -39,7 +45,7 @@ def get_deck(
 @router.post("", response_model=DeckOut, status_code=201)
 def create_deck(
     deck_req: DeckCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal_for_write),
     db_session: Session = Depends(get_db),
 ):
     if deck_req.category_id:
@@ -58,25 +64,45 @@ def create_deck(
     return deck
 
 
-@router.get("", response_model=List[DeckOut])
+@router.get("", response_model=List[DeckWithCountsOut] | List[DeckOut])
 def get_decks(
     category_id: UUID = None,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    include_subcategories: bool = False,
+    include_counts: bool = False,
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
+    """The user's decks.
+
+    With include_counts, each deck also has its card_count, due_count,
+    new_count and last_reviewed_at, from one grouped query.
+    """
     query = db_session.query(Deck).filter(Deck.user_id == user.id).order_by(Deck.name)
 
-    if category_id:
+    if category_id and include_subcategories:
+        query = query.filter(Deck.category_id.in_(subtree_ids(category_id)))
+    elif category_id:
         query = query.filter(Deck.category_id == category_id)
 
-    return query.all()
+    if not include_counts:
+        return query.all()
+
+    rows = (
+        query.outerjoin(Card, Card.deck_id == Deck.id)
+        .add_columns(*deck_counts_columns(datetime.now(timezone.utc)))
+        .group_by(Deck.id)
+        .all()
+    )
+    return [
+        DeckWithCountsOut.from_deck(row.Deck, deck_counts_from_row(row)) for row in rows
+    ]
 
 
 @router.patch("/{deck_id}", response_model=DeckOut)
 def update_deck(
     deck_id: UUID,
     deck_req: DeckUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     try:
@@ -100,23 +126,29 @@ def update_deck(
 @router.delete("/{deck_id}")
 def delete_deck(
     deck_id: UUID,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
-    try:
-        deck = get_user_deck(deck_id, user.id, db_session)
-    except ValueError as err:
-        raise HTTPException(status_code=404, detail=str(err))
+    # The cards and the deck's statistics go with it, through ON DELETE
+    # CASCADE, the reviews are kept
+    deleted_id = db_session.scalar(
+        delete(Deck)
+        .where(Deck.id == deck_id, Deck.user_id == user.id)
+        .returning(Deck.id)
+        .execution_options(synchronize_session=False)
+    )
+    if deleted_id is None:
+        raise HTTPException(status_code=404, detail="Deck not found or access denied")
 
-    deck.delete(db_session)
-    return {"id": deck.id}
+    db_session.commit()
+    return {"id": deleted_id}
 
 
 @router.post("/import", status_code=201)
 async def import_deck(
     format: str = "repeater",
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
 ):
     if user.is_guest:
@@ -150,8 +182,8 @@ async def import_deck(
 )
 def export_deck(
     deck_id: UUID,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
     if user.is_guest:
         raise HTTPException(status_code=403)
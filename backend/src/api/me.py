@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 
-from src.auth.jwt import get_current_user
+from src.auth.jwt import get_current_user_async
 from src.db.models import User
 from src.schemas.user import UserOut
 
@@ -8,5 +8,5 @@ router = APIRouter(tags=["me"])
 
 
 @router.get("/me", response_model=UserOut)
-async def get_user_info(user: User = Depends(get_current_user)):
+async def get_user_info(user: User = Depends(get_current_user_async)):
     return user
@@ -1,21 +1,25 @@
+from datetime import datetime, timezone
 from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from src.auth.jwt import get_current_user
-from src.const import (
-    SCHEDULE_DEFAULT_EASE_FACTOR,
-    SCHEDULE_DEFAULT_INTERVAL,
-    SCHEDULE_DEFAULT_REPETITIONS,
-)
+from src.auth.jwt import get_current_principal
+from src.auth.principal import Principal
 from src.db import get_db
-from src.db.models import Card, Review, User
+from src.db.models import Card, Review, ReviewFeedback
+from src.db.routing import get_read_db
 from src.schedulers import Scheduler
 from src.schedulers.basic import BasicScheduler
-from src.schemas.review import ReviewCreate, ReviewOut
-from src.util import get_user_card
+from src.schemas.review import (
+    ReviewBatchCreate,
+    ReviewBatchResult,
+    ReviewCreate,
+    ReviewOut,
+)
+from src.statistics.rollups import record_reviews
+from src.util import get_user_card, get_user_cards
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
@@ -24,10 +28,46 @@ def get_scheduler() -> Scheduler:
     return BasicScheduler()
 
 
+def review_card(
+    card: Card,
+    user_id: UUID,
+    feedback: ReviewFeedback,
+    reviewed_at: datetime,
+    scheduler: Scheduler,
+) -> Review:
+    """Schedule the card's next review and build the Review row for it.
+
+    Only updates the card in memory, the caller persists both.
+    """
+    schedule_result = scheduler.schedule(
+        feedback, card.repetitions, card.ease_factor, card.interval, reviewed_at
+    )
+
+    review = Review(
+        card_id=card.id,
+        deck_id=card.deck.id,
+        user_id=user_id,
+        reviewed_at=reviewed_at,
+        card_content=card.content,
+        deck_name=card.deck.name,
+        feedback=feedback,
+        interval=schedule_result.interval,
+        repetitions=schedule_result.repetitions,
+        ease_factor=round(schedule_result.ease_factor, 2),
+    )
+
+    card.next_review_date = schedule_result.next_review_date
+    card.repetitions = review.repetitions
+    card.ease_factor = review.ease_factor
+    card.interval = review.interval
+    card.last_reviewed_at = reviewed_at
+    return review
+
+
 @router.post("", response_model=ReviewOut, status_code=201)
 def create_review(
     review_req: ReviewCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db_session: Session = Depends(get_db),
     scheduler: Scheduler = Depends(get_scheduler),
 ):
@@ -36,48 +76,83 @@ def create_review(
     except ValueError as err:
         raise HTTPException(status_code=404, detail=str(err))
 
-    last_review = (
-        Review.filter_by(db_session, card_id=card.id)
-        .order_by(Review.reviewed_at.desc())
-        .first()
+    review = review_card(
+        card, user.id, review_req.feedback, datetime.now(timezone.utc), scheduler
     )
+    review.save(db_session, commit=False)
+    record_reviews(db_session, [review])
 
-    repetitions = SCHEDULE_DEFAULT_REPETITIONS
-    ease_factor = SCHEDULE_DEFAULT_EASE_FACTOR
-    interval = SCHEDULE_DEFAULT_INTERVAL
-
-    if last_review:
-        repetitions = last_review.repetitions
-        ease_factor = last_review.ease_factor
-        interval = last_review.interval
-
-    schedule_result = scheduler.schedule(
-        review_req.feedback, repetitions, ease_factor, interval
-    )
+    # Serialize before committing, the review has no server-generated columns to
+    # reload and committing expires it
+    review_out = ReviewOut.model_validate(review, from_attributes=True)
+    db_session.commit()
+    return review_out
 
-    card.next_review_date = schedule_result.next_review_date
-    card.save(db_session)
 
-    review = Review(
-        card_id=card.id,
-        deck_id=card.deck.id,
-        user_id=user.id,
-        card_content=card.content,
-        deck_name=card.deck.name,
-        feedback=review_req.feedback,
-        interval=schedule_result.interval,
-        repetitions=schedule_result.repetitions,
-        ease_factor="{:.2f}".format(schedule_result.ease_factor),
+@router.post("/batch", response_model=List[ReviewBatchResult])
+def create_reviews_batch(
+    batch_req: ReviewBatchCreate,
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_db),
+    scheduler: Scheduler = Depends(get_scheduler),
+):
+    """Replay reviews recorded offline, in the given order, in one transaction.
+
+    Items for unknown cards, with a review date in the future or older than
+    the card's last review are reported in their result and skipped, the
+    rest of the batch is still stored.
+    """
+    cards = get_user_cards(
+        {item.card_id for item in batch_req.reviews}, user.id, db_session
     )
-    review.save(db_session)
-    return review
+    now = datetime.now(timezone.utc)
+
+    reviews = []
+    results = []
+    for item in batch_req.reviews:
+        card = cards.get(item.card_id)
+        if card is None:
+            results.append((item, None, "Card not found or access denied"))
+            continue
+
+        reviewed_at = item.reviewed_at or now
+        if reviewed_at.tzinfo is None:
+            reviewed_at = reviewed_at.replace(tzinfo=timezone.utc)
+        if reviewed_at > now:
+            results.append((item, None, "Review date is in the future"))
+            continue
+        if card.last_reviewed_at and reviewed_at < card.last_reviewed_at:
+            # Scheduling it would move the card back in time
+            results.append((item, None, "Review is older than the card's last review"))
+            continue
+
+        review = review_card(card, user.id, item.feedback, reviewed_at, scheduler)
+        reviews.append(review)
+        results.append((item, review, None))
+
+    db_session.add_all(reviews)
+    db_session.flush()
+    record_reviews(db_session, reviews)
+
+    batch_out = [
+        ReviewBatchResult(
+            card_id=item.card_id,
+            review=ReviewOut.model_validate(review, from_attributes=True)
+            if review
+            else None,
+            error=error,
+        )
+        for item, review, error in results
+    ]
+    db_session.commit()
+    return batch_out
 
 
 @router.get("/{card_id}", response_model=List[ReviewOut])
 def get_review_history(
     card_id: UUID,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
 ):
     try:
         card = get_user_card(card_id, user.id, db_session)
@@ -2,54 +2,36 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.jwt import get_current_user
-from src.db import get_db
-from src.db.models import User
+from src.auth.jwt import get_current_principal_async
+from src.auth.principal import Principal
+from src.db.routing import get_async_read_db
 from src.schemas.statistics import DeckStatistics, StatisticsOut
-from src.statistics import (
-    calculate_daily_reviews,
-    calculate_retention_rate,
-    calculate_streak,
-    calculate_success_rate,
-    get_deck_statistics,
-)
-from src.util import get_user_deck
+from src.statistics.queries import query_deck_statistics, query_user_review_summary
 
 router = APIRouter(prefix="/stats", tags=["statistics"])
 
 
 @router.get("", response_model=StatisticsOut)
 async def get_user_statistics(
-    user: User = Depends(get_current_user), db_session: Session = Depends(get_db)
+    user: Principal = Depends(get_current_principal_async),
+    db_session: AsyncSession = Depends(get_async_read_db),
 ):
-    user_reviews = user.reviews
-    user_decks = user.decks
-
     today = datetime.now(timezone.utc)
-    review_dates = [review.reviewed_at for review in user_reviews]
-
-    streak = calculate_streak(today, review_dates)
-    daily_reviews = calculate_daily_reviews(review_dates)
-    overall_retention_rate = calculate_retention_rate(user_reviews)
-    overall_success_rate = calculate_success_rate(user_reviews)
-
-    deck_statistics = []
-    for deck in user_decks:
-        deck_stats = get_deck_statistics(deck, user_reviews)
-        deck_statistics.append(deck_stats)
+    summary = await query_user_review_summary(db_session, user.id, today.date())
 
+    deck_statistics = await query_deck_statistics(db_session, user.id)
     deck_statistics.sort(
         key=lambda ds: (ds.last_studied is None, ds.last_studied), reverse=True
     )
 
     return StatisticsOut(
-        total_reviews=len(user_reviews),
-        daily_reviews=dict(daily_reviews),
-        success_rate="{:.2f}".format(overall_success_rate),
-        retention_rate="{:.2f}".format(overall_retention_rate),
-        streak=streak,
+        total_reviews=summary.counts.total,
+        daily_reviews=summary.daily_reviews,
+        success_rate="{:.2f}".format(summary.counts.success_rate),
+        retention_rate="{:.2f}".format(summary.counts.retention_rate),
+        streak=summary.streak,
         deck_statistics=deck_statistics,
     )
 
@@ -57,13 +39,11 @@ async def get_user_statistics(
 @router.get("/{deck_id}", response_model=DeckStatistics)
 async def get_user_deck_statistics(
     deck_id: UUID,
-    user: User = Depends(get_current_user),
-    db_session: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal_async),
+    db_session: AsyncSession = Depends(get_async_read_db),
 ):
-    try:
-        deck = get_user_deck(deck_id, user.id, db_session)
-    except ValueError as err:
-        raise HTTPException(status_code=404, detail=str(err))
-
-    user_reviews = user.reviews
-    return get_deck_statistics(deck, user_reviews)
+    # Only the user's own decks are returned, which doubles as the access check
+    deck_statistics = await query_deck_statistics(db_session, user.id, deck_id)
+    if not deck_statistics:
+        raise HTTPException(status_code=404, detail="Deck not found or access denied")
+    return deck_statistics[0]
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session, aliased, contains_eager
+
+from src.auth.jwt import get_current_principal
+from src.auth.principal import Principal
+from src.categories.closure import subtree_ids
+from src.const import (
+    STUDY_QUEUE_DEFAULT_SIZE,
+    STUDY_QUEUE_DUE_COUNT_CAP,
+    STUDY_QUEUE_MAX_SIZE,
+)
+from src.db.models import Card, Deck
+from src.db.routing import get_read_db
+from src.schemas.card import CardOut
+from src.schemas.study import StudyQueueOut
+
+router = APIRouter(prefix="/study", tags=["study"])
+
+
+@router.get("/queue", response_model=StudyQueueOut)
+def get_study_queue(
+    limit: int = Query(STUDY_QUEUE_DEFAULT_SIZE, ge=1, le=STUDY_QUEUE_MAX_SIZE),
+    deck_id: UUID = None,
+    category_id: UUID = None,
+    include_subcategories: bool = False,
+    user: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_read_db),
+):
+    """The next due cards, taking turns between decks.
+
+    Every deck contributes its most overdue card first, then its second most
+    overdue one and so on. Each deck is read through
+    ix_cards_deck_id_next_review_date and at most limit cards of it are
+    looked at, so the size of the backlog doesn't matter.
+
+    category_id only selects the decks directly in the category, as in
+    GET /decks. With include_subcategories, the decks of every category
+    below it are studied as well.
+    """
+    now = datetime.now(timezone.utc)
+
+    deck_filters = [
+        Deck.user_id == user.id,
+        Deck.is_paused == False,
+        Deck.is_archived == False,
+    ]
+    if deck_id:
+        deck_filters.append(Deck.id == deck_id)
+    if category_id and include_subcategories:
+        deck_filters.append(Deck.category_id.in_(subtree_ids(category_id)))
+    elif category_id:
+        deck_filters.append(Deck.category_id == category_id)
+
+    deck_due = (
+        select(
+            Card,
+            func.row_number().over(order_by=Card.next_review_date).label("deck_rank"),
+        )
+        .where(Card.deck_id == Deck.id, Card.next_review_date <= now)
+        .order_by(Card.next_review_date)
+        .limit(limit)
+        .lateral("deck_due")
+    )
+    due_card = aliased(Card, deck_due)
+
+    cards = (
+        db_session.query(due_card)
+        .select_from(Deck)
+        .join(deck_due, true())
+        .filter(*deck_filters)
+        .options(contains_eager(due_card.deck))
+        .order_by(deck_due.c.deck_rank, due_card.next_review_date, due_card.id)
+        .limit(limit)
+        .all()
+    )
+
+    due_cards = (
+        select(Card.id)
+        .join(Deck)
+        .where(*deck_filters, Card.next_review_date <= now)
+        .limit(STUDY_QUEUE_DUE_COUNT_CAP + 1)
+    )
+    due_count = db_session.scalar(
+        select(func.count()).select_from(due_cards.subquery())
+    )
+
+    return StudyQueueOut(
+        cards=[CardOut.from_card(card) for card in cards],
+        due_count=min(due_count, STUDY_QUEUE_DUE_COUNT_CAP),
+        due_count_capped=due_count > STUDY_QUEUE_DUE_COUNT_CAP,
+    )
@@ -1,13 +1,18 @@
 from datetime import datetime, timedelta, timezone
 from os import getenv
+from typing import Optional, Tuple
 from uuid import UUID, uuid4
 
 import jwt
 from fastapi import Cookie, Depends, HTTPException, Response
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.db import get_db
-from src.db.models import User, UserRole
+from src.auth.principal import Principal, principal_cache
+from src.auth.token_cache import token_cache
+from src.db import get_async_db, get_db
+from src.db.models import AuthProviders, User, UserRole
 
 SECRET_KEY = getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -50,7 +55,11 @@ def create_access_token(
     return _create_jwt(
         user.id,
         exp_delta_seconds,
-        {"role": user.role, "token_version": user.token_version},
+        {
+            "role": user.role,
+            "token_version": user.token_version,
+            **_guest_claims(user),
+        },
     )
 
 
@@ -60,10 +69,21 @@ def create_refresh_token(
     return _create_jwt(
         user.id,
         exp_delta_seconds,
-        {"jti": str(uuid4()), "token_version": user.token_version},
+        {
+            "jti": str(uuid4()),
+            "token_version": user.token_version,
+            **_guest_claims(user),
+        },
     )
 
 
+def _guest_claims(user: User) -> dict:
+    # Enough to recreate a guest that doesn't have a users row yet
+    if not user.is_guest:
+        return {}
+    return {"role": UserRole.GUEST, "created_at": int(user.created_at.timestamp())}
+
+
 def _create_jwt(user_id: UUID, exp_delta_seconds: int, data: dict = {}) -> str:
     payload = {
         "sub": str(user_id),
@@ -83,13 +103,69 @@ def _create_jwt(user_id: UUID, exp_delta_seconds: int, data: dict = {}) -> str:
 
 
 def decode_jwt(token: str) -> dict:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    """The claims of a token, verified now or on an earlier call.
+
+    Raises jwt.InvalidTokenError if the token is invalid or expired.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.add(token, claims)
+    return claims
+
+
+def new_guest_user() -> User:
+    """A guest that is only stored in its tokens.
+
+    Guests get a users row on their first write, see
+    get_current_principal_for_write, so requests without cookies don't insert
+    anything.
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    return User(
+        id=uuid4(),
+        role=UserRole.GUEST,
+        auth_provider=AuthProviders.PASSWORD,
+        token_version=0,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def guest_user_from_claims(payload: dict) -> Optional[User]:
+    """The guest a token was minted for, if it is a guest's token"""
+    if payload.get("role") != UserRole.GUEST or "created_at" not in payload:
+        return None
+    created_at = datetime.fromtimestamp(payload["created_at"], timezone.utc)
+    return User(
+        id=UUID(payload["sub"]),
+        role=UserRole.GUEST,
+        auth_provider=AuthProviders.PASSWORD,
+        token_version=payload.get("token_version", 0),
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def set_guest_cookies(response: Response, guest_user: User):
+    access_token = create_access_token(guest_user)
+    refresh_token = create_refresh_token(guest_user, GUEST_REFRESH_TOKEN_EXPIRE_SECONDS)
+
+    response.set_cookie(**get_access_token_cookie_kwargs(access_token))
+    response.set_cookie(
+        **get_refresh_token_cookie_kwargs(
+            refresh_token, GUEST_REFRESH_TOKEN_EXPIRE_SECONDS
+        )
+    )
 
 
-def create_guest_user(db_session: Session) -> User:
-    user = User(role=UserRole.GUEST)
-    user.save(db_session)
-    return user
+def decode_access_token(access_token: str) -> Tuple[UUID, dict]:
+    """The user id and claims of an access token"""
+    try:
+        payload = decode_jwt(access_token)
+        return UUID(payload["sub"]), payload
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
 
 
 def get_current_user(
@@ -98,30 +174,98 @@ def get_current_user(
     db_session: Session = Depends(get_db),
 ) -> User:
     if access_token is None:
-        guest_user = create_guest_user(db_session)
+        guest_user = new_guest_user()
+        set_guest_cookies(response, guest_user)
+        return guest_user
 
-        access_token = create_access_token(guest_user)
-        refresh_token = create_refresh_token(
-            guest_user, GUEST_REFRESH_TOKEN_EXPIRE_SECONDS
-        )
+    user_id, payload = decode_access_token(access_token)
+    user = User.get(db_session, user_id) or guest_user_from_claims(payload)
+    if user:
+        return user
+    raise HTTPException(status_code=401, detail="Invalid token")
 
-        response.set_cookie(**get_access_token_cookie_kwargs(access_token))
-        response.set_cookie(
-            **get_refresh_token_cookie_kwargs(
-                refresh_token, GUEST_REFRESH_TOKEN_EXPIRE_SECONDS
-            )
-        )
+
+async def get_current_user_async(
+    response: Response,
+    access_token: str | None = Cookie(default=None),
+    db_session: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user for async def endpoints"""
+    if access_token is None:
+        guest_user = new_guest_user()
+        set_guest_cookies(response, guest_user)
         return guest_user
 
-    try:
-        payload = decode_jwt(access_token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    user_id, payload = decode_access_token(access_token)
+    user = await User.get_async(db_session, user_id) or guest_user_from_claims(payload)
+    if user:
+        return user
+    raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def get_current_principal(
+    response: Response,
+    access_token: str | None = Cookie(default=None),
+    db_session: Session = Depends(get_db),
+) -> Principal:
+    """The current user's id and role, from the principal cache if possible.
+
+    Cheaper than get_current_user for endpoints that don't need the rest of
+    the user, a cache hit doesn't touch the database.
+    """
+    if access_token is None:
+        guest_user = new_guest_user()
+        set_guest_cookies(response, guest_user)
+        return Principal.from_user(guest_user)
+
+    user_id, payload = decode_access_token(access_token)
+    principal = principal_cache.get(user_id, payload.get("token_version"))
+    if principal:
+        return principal
 
-        user = User.get(db_session, user_id)
-        if user:
-            return user
+    user = User.get(db_session, user_id) or guest_user_from_claims(payload)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid token")
-    except jwt.InvalidTokenError:
+    principal = Principal.from_user(user)
+    principal_cache.add(principal)
+    return principal
+
+
+async def get_current_principal_async(
+    response: Response,
+    access_token: str | None = Cookie(default=None),
+    db_session: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """get_current_principal for async def endpoints"""
+    if access_token is None:
+        guest_user = new_guest_user()
+        set_guest_cookies(response, guest_user)
+        return Principal.from_user(guest_user)
+
+    user_id, payload = decode_access_token(access_token)
+    principal = principal_cache.get(user_id, payload.get("token_version"))
+    if principal:
+        return principal
+
+    user = await User.get_async(db_session, user_id) or guest_user_from_claims(payload)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid token")
+    principal = Principal.from_user(user)
+    principal_cache.add(principal)
+    return principal
+
+
+def get_current_principal_for_write(
+    principal: Principal = Depends(get_current_principal),
+    db_session: Session = Depends(get_db),
+) -> Principal:
+    """get_current_principal for endpoints that store rows referencing the
+    user. A guest's users row is inserted here, in the endpoint's transaction,
+    if it doesn't exist yet."""
+    if principal.is_guest:
+        db_session.execute(
+            insert(User)
+            .values(id=principal.id, role=principal.role)
+            .on_conflict_do_nothing(index_elements=[User.id])
+        )
+    return principal
@@ -0,0 +1,67 @@
+"""Password hashing, on a small thread pool of its own.
+
+bcrypt is slow on purpose. Run on the request threads, a burst of logins or
+registrations takes all of them and ordinary requests queue behind it. The
+async helpers here hand the work to PASSWORD_HASHING_WORKERS threads instead,
+with at most PASSWORD_HASHING_QUEUE_SIZE more requests waiting for one. Past
+that PasswordHashingBusyError is raised, which the app turns into a 503.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+
+import bcrypt
+
+from src.exceptions import PasswordHashingBusyError
+
+BCRYPT_ROUNDS = int(getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASHING_WORKERS = int(
+    getenv("PASSWORD_HASHING_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+PASSWORD_HASHING_QUEUE_SIZE = int(getenv("PASSWORD_HASHING_QUEUE_SIZE", 16))
+
+
+def hash_password(password: str) -> str:
+    pw_bytes = password.encode("utf-8")
+    return bcrypt.hashpw(pw_bytes, bcrypt.gensalt(BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Whether the hash was made with another cost than BCRYPT_ROUNDS"""
+    # $2b$<cost>$<salt and hash>
+    return int(password_hash.split("$")[2]) != BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_size: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        # Hashes running or waiting for a worker
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusyError()
+        future = self._executor.submit(fn, *args)
+        # Released once the work is done, even if the request was cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASHING_WORKERS, PASSWORD_HASHING_QUEUE_SIZE)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+
+async def check_password_async(password: str, password_hash: str) -> bool:
+    return await password_hasher.run(check_password, password, password_hash)
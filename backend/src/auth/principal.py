@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from os import getenv
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src.db.models import User, UserRole
+
+USER_CACHE_SIZE = int(getenv("USER_CACHE_SIZE", 10_000))
+USER_CACHE_TTL_SECONDS = float(getenv("USER_CACHE_TTL_SECONDS", 60))
+
+CHANGED_USER_IDS_KEY = "changed_user_ids"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Who is making a request, for endpoints that need no more of the user
+    than its id and role"""
+
+    id: UUID
+    role: str
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, role=user.role, token_version=user.token_version)
+
+    @property
+    def is_guest(self):
+        return self.role == UserRole.GUEST
+
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN
+
+
+class PrincipalCache:
+    """A per-process LRU cache of principals, by user id and token version.
+
+    Entries expire after ttl seconds, which bounds how long other processes
+    can keep serving a principal that this one has invalidated.
+    """
+
+    def __init__(
+        self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_SECONDS
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[UUID, tuple[Principal, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID, token_version: Optional[int]) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            # A token minted before the version was bumped doesn't match
+            if principal.token_version != token_version:
+                return None
+
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def add(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+# Users who were added or deleted, or whose role or token version changed,
+# are dropped from the cache once the change is committed. Dropping them any
+# earlier would let a concurrent request cache the old row again.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(db_session: Session, flush_context):
+    changed_user_ids = db_session.info.setdefault(CHANGED_USER_IDS_KEY, set())
+    # A new row can replace a guest that was only stored in its tokens
+    for user in chain(db_session.new, db_session.deleted):
+        if isinstance(user, User):
+            changed_user_ids.add(user.id)
+
+    for user in db_session.dirty:
+        if not isinstance(user, User):
+            continue
+        state = inspect(user)
+        if any(
+            state.attrs[name].history.has_changes()
+            for name in ["role", "token_version"]
+        ):
+            changed_user_ids.add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(db_session: Session):
+    for user_id in db_session.info.pop(CHANGED_USER_IDS_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(db_session: Session):
+    db_session.info.pop(CHANGED_USER_IDS_KEY, None)
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from os import getenv
+from typing import Optional
+
+TOKEN_CACHE_SIZE = int(getenv("TOKEN_CACHE_SIZE", 10_000))
+
+
+@dataclass
+class TokenCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+
+class VerifiedTokenCache:
+    """A per-process LRU cache of the claims of tokens whose signature was
+    verified, so a token sent again doesn't have to be verified again.
+
+    Entries are keyed by the token's SHA-256 digest, the tokens themselves
+    aren't kept in memory. An entry is valid until the token's exp claim.
+    Only tokens that passed verification are added, an invalid token is
+    verified, and rejected, every time. A maxsize of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.metrics = TokenCacheMetrics()
+        self._entries: OrderedDict[bytes, tuple[dict, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.metrics.misses += 1
+                return None
+
+            claims, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.metrics.expired += 1
+                self.metrics.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.metrics.hits += 1
+            # A copy, callers are free to change theirs
+            return dict(claims)
+
+    def add(self, token: str, claims: dict):
+        if self.maxsize <= 0:
+            return
+        key = self._key(token)
+        # Tokens without exp never expire, they stay until they're evicted
+        expires_at = claims.get("exp")
+        with self._lock:
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.metrics.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = asdict(self.metrics)
+            size = len(self._entries)
+        lookups = metrics["hits"] + metrics["misses"]
+        return dict(
+            size=size,
+            maxsize=self.maxsize,
+            **metrics,
+            hit_rate=metrics["hits"] / lookups if lookups else 0,
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = VerifiedTokenCache()
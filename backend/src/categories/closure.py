@@ -0,0 +1,219 @@
+"""The category closure table, one row per category and ancestor pair.
+
+With it, everything under a category at any depth is one indexed lookup
+on ancestor_id, see subtree_ids. The category endpoints keep it up to date
+in the same transaction as their change to the categories table. Deleting a
+category deletes its rows through the foreign keys' ON DELETE CASCADE, but
+its descendants then need remove_from_closure.
+
+Run this module to check the table against the categories, and with
+--rebuild to recompute it.
+"""
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Integer, delete, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+
+from src.const import CATEGORY_HIERARCHY_MAX_DEPTH
+from src.db import get_db
+from src.db.models import Category, CategoryClosure
+from src.log import set_up_logger
+
+CLOSURE_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+@dataclass
+class ClosureDrift:
+    missing_rows: int
+    unexpected_rows: int
+
+    @property
+    def drifted(self) -> bool:
+        return bool(self.missing_rows or self.unexpected_rows)
+
+
+def subtree_ids(category_id: UUID):
+    """The ids of a category and of every category below it"""
+    return select(CategoryClosure.descendant_id).where(
+        CategoryClosure.ancestor_id == category_id
+    )
+
+
+def add_to_closure(db_session: Session, category_id: UUID, parent_id: Optional[UUID]):
+    """Add the rows of a new category, below parent_id"""
+    category_id = literal(category_id, PG_UUID(as_uuid=True))
+    rows = select(category_id, category_id, literal(0, Integer))
+    if parent_id:
+        rows = rows.union_all(
+            select(
+                CategoryClosure.ancestor_id,
+                category_id,
+                CategoryClosure.depth + 1,
+            ).where(CategoryClosure.descendant_id == parent_id)
+        )
+    db_session.execute(insert(CategoryClosure).from_select(CLOSURE_COLUMNS, rows))
+
+
+def move_in_closure(
+    db_session: Session, category_id: UUID, new_parent_id: Optional[UUID]
+):
+    """Move a category and its subtree below new_parent_id"""
+    subtree = subtree_ids(category_id)
+    # Detach the subtree from its old ancestors
+    db_session.execute(
+        delete(CategoryClosure)
+        .where(
+            CategoryClosure.descendant_id.in_(subtree),
+            CategoryClosure.ancestor_id.not_in(subtree),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if new_parent_id is None:
+        return
+
+    # Every new ancestor above every category of the subtree
+    ancestor = aliased(CategoryClosure)
+    descendant = aliased(CategoryClosure)
+    db_session.execute(
+        insert(CategoryClosure).from_select(
+            CLOSURE_COLUMNS,
+            select(
+                ancestor.ancestor_id,
+                descendant.descendant_id,
+                ancestor.depth + descendant.depth + 1,
+            )
+            .join(descendant, true())
+            .where(ancestor.descendant_id == new_parent_id)
+            .where(descendant.ancestor_id == category_id),
+        )
+    )
+
+
+def remove_from_closure(db_session: Session, category_id: UUID):
+    """Remove the rows of a category whose children move up to its parent"""
+    below = select(CategoryClosure.descendant_id).where(
+        CategoryClosure.ancestor_id == category_id,
+        CategoryClosure.descendant_id != category_id,
+    )
+    above = select(CategoryClosure.ancestor_id).where(
+        CategoryClosure.descendant_id == category_id,
+        CategoryClosure.ancestor_id != category_id,
+    )
+    # Everything below is one level closer to everything above
+    db_session.execute(
+        update(CategoryClosure)
+        .where(
+            CategoryClosure.descendant_id.in_(below),
+            CategoryClosure.ancestor_id.in_(above),
+        )
+        .values(depth=CategoryClosure.depth - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db_session.execute(
+        delete(CategoryClosure)
+        .where(
+            (CategoryClosure.ancestor_id == category_id)
+            | (CategoryClosure.descendant_id == category_id)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def closure_from_categories(user_id: Optional[UUID] = None):
+    base = select(
+        Category.id.label("ancestor_id"),
+        Category.id.label("descendant_id"),
+        literal(0, Integer).label("depth"),
+    )
+    if user_id:
+        base = base.where(Category.user_id == user_id)
+    closure = base.cte("closure", recursive=True)
+
+    child = aliased(Category)
+    closure = closure.union_all(
+        select(closure.c.ancestor_id, child.id, closure.c.depth + 1)
+        .join(child, child.parent_id == closure.c.descendant_id)
+        .where(closure.c.depth < CATEGORY_HIERARCHY_MAX_DEPTH)
+    )
+    return select(closure.c.ancestor_id, closure.c.descendant_id, closure.c.depth)
+
+
+def stored_closure(user_id: Optional[UUID] = None):
+    query = select(*[getattr(CategoryClosure, column) for column in CLOSURE_COLUMNS])
+    if user_id:
+        query = query.join(
+            Category, Category.id == CategoryClosure.descendant_id
+        ).where(Category.user_id == user_id)
+    return query
+
+
+def rebuild_closure(db_session: Session, user_id: Optional[UUID] = None):
+    """Recompute the closure table from the categories, for one user or everyone"""
+    try:
+        stmt = delete(CategoryClosure)
+        if user_id:
+            stmt = stmt.where(
+                CategoryClosure.descendant_id.in_(
+                    select(Category.id).where(Category.user_id == user_id)
+                )
+            )
+        db_session.execute(stmt)
+        db_session.execute(
+            insert(CategoryClosure).from_select(
+                CLOSURE_COLUMNS, closure_from_categories(user_id)
+            )
+        )
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+
+def find_closure_drift(
+    db_session: Session, user_id: Optional[UUID] = None
+) -> ClosureDrift:
+    """Count closure rows that disagree with a recomputation from the categories"""
+    source = closure_from_categories(user_id)
+    stored = stored_closure(user_id)
+    missing_rows, unexpected_rows = [
+        db_session.scalar(select(func.count()).select_from(mismatched.subquery()))
+        for mismatched in [source.except_(stored), stored.except_(source)]
+    ]
+    return ClosureDrift(missing_rows=missing_rows, unexpected_rows=unexpected_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the category closure table against the categories"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the closure table"
+    )
+    args = parser.parse_args()
+
+    with next(get_db()) as db_session:
+        if args.rebuild:
+            rebuild_closure(db_session)
+            logging.info("Rebuilt the category closure table")
+
+        drift = find_closure_drift(db_session)
+        if drift.drifted:
+            logging.error(
+                f"Category closure drifted: {drift.missing_rows} missing rows, "
+                f"{drift.unexpected_rows} unexpected rows"
+            )
+            sys.exit(1)
+        logging.info("Category closure is consistent")
+
+
+if __name__ == "__main__":
+    set_up_logger()
+    main()
@@ -0,0 +1,142 @@
+"""Ancestors, descendants, depth and path of categories, in one query each.
+
+Each function follows parent_id with a WITH RECURSIVE query instead of
+loading the categories one by one through Category.parent and
+Category.children. The CTEs are public too, so that callers can join them
+to their own queries.
+
+Depths count levels below the root, a root is at depth 0.
+"""
+
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import ARRAY, Integer, Row, String, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.orm import Session, aliased
+
+from src.const import CATEGORY_HIERARCHY_MAX_DEPTH
+from src.db.models import Category
+
+
+def lineage_cte(category_ids: Iterable[UUID]):
+    """The categories and each of their ancestors, with how many levels up
+    from the category (category_id) each one (id) is"""
+    lineage = (
+        select(
+            Category.id.label("category_id"),
+            Category.id,
+            Category.name,
+            Category.parent_id,
+            literal(0, Integer).label("distance"),
+        )
+        .where(Category.id.in_(category_ids))
+        .cte("lineage", recursive=True)
+    )
+    parent = aliased(Category)
+    return lineage.union_all(
+        select(
+            lineage.c.category_id,
+            parent.id,
+            parent.name,
+            parent.parent_id,
+            lineage.c.distance + 1,
+        )
+        .join(parent, parent.id == lineage.c.parent_id)
+        .where(lineage.c.distance < CATEGORY_HIERARCHY_MAX_DEPTH)
+    )
+
+
+def descendants_cte(category_id: UUID):
+    """The categories below a category, with how many levels below it they are"""
+    descendants = (
+        select(
+            Category.id,
+            Category.parent_id,
+            literal(1, Integer).label("distance"),
+        )
+        .where(Category.parent_id == category_id)
+        .cte("descendants", recursive=True)
+    )
+    child = aliased(Category)
+    return descendants.union_all(
+        select(child.id, child.parent_id, descendants.c.distance + 1)
+        .join(child, child.parent_id == descendants.c.id)
+        .where(descendants.c.distance < CATEGORY_HIERARCHY_MAX_DEPTH)
+    )
+
+
+def forest_cte(user_id: UUID):
+    """All of a user's categories that can be reached from a root, with their
+    depth and the names from the root down to them"""
+    forest = (
+        select(
+            Category.id,
+            literal(0, Integer).label("depth"),
+            array([Category.name]).label("path"),
+        )
+        .where(Category.user_id == user_id, Category.parent_id.is_(None))
+        .cte("forest", recursive=True)
+    )
+    child = aliased(Category)
+    return forest.union_all(
+        select(
+            child.id,
+            forest.c.depth + 1,
+            func.array_append(forest.c.path, child.name, type_=ARRAY(String)),
+        )
+        .join(child, child.parent_id == forest.c.id)
+        .where(forest.c.depth < CATEGORY_HIERARCHY_MAX_DEPTH)
+    )
+
+
+def get_lineage(db_session: Session, category_id: UUID) -> List[Row]:
+    """The category and its ancestors, from the root down to the category"""
+    lineage = lineage_cte([category_id])
+    return db_session.execute(
+        select(lineage.c.id, lineage.c.name, lineage.c.parent_id).order_by(
+            lineage.c.distance.desc()
+        )
+    ).all()
+
+
+def get_ancestors(db_session: Session, category_id: UUID) -> List[Row]:
+    """The ancestors of a category, from the root down to its parent"""
+    return get_lineage(db_session, category_id)[:-1]
+
+
+def get_depth(db_session: Session, category_id: UUID) -> int:
+    return len(get_ancestors(db_session, category_id))
+
+
+def get_path(db_session: Session, category_id: UUID) -> List[str]:
+    """The names of the category's ancestors and its own, from the root down"""
+    return [row.name for row in get_lineage(db_session, category_id)]
+
+
+def get_descendants(db_session: Session, category_id: UUID) -> List[Row]:
+    """The categories below a category, level by level"""
+    descendants = descendants_cte(category_id)
+    return db_session.execute(
+        select(descendants).order_by(descendants.c.distance)
+    ).all()
+
+
+def get_subtree_height(db_session: Session, category_id: UUID) -> int:
+    """How many levels of categories there are below a category"""
+    descendants = descendants_cte(category_id)
+    return db_session.scalar(select(func.coalesce(func.max(descendants.c.distance), 0)))
+
+
+def get_forest(db_session: Session, user_id: UUID) -> Dict[UUID, Row]:
+    """The depth and path of each of a user's categories, by id"""
+    forest = forest_cte(user_id)
+    return {row.id: row for row in db_session.execute(select(forest)).all()}
+
+
+def would_create_cycle(
+    db_session: Session, category_id: UUID, new_parent_id: UUID
+) -> bool:
+    """Whether the new parent is the category itself or one of its descendants"""
+    lineage = lineage_cte([new_parent_id])
+    return db_session.scalar(select(exists().where(lineage.c.id == category_id)))
@@ -0,0 +1,106 @@
+"""Build a user's category tree from two flat queries.
+
+Categories and decks are read as plain rows, grouped by parent and by
+category, and the nodes are created in one walk from the roots down. The
+number of queries doesn't depend on the size of the tree, and neither
+parents nor decks are lazy loaded.
+
+With include_counts, a third query counts the cards of every deck, and each
+node's counts are folded up from its decks and its children's counts.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.db.models import Category, Deck
+from src.decks.counts import DeckCounts, get_deck_counts
+from src.schemas.category import CategoryNode, CategoryTree, DeckSummary
+
+
+def get_category_rows(db_session: Session, user_id: UUID):
+    return db_session.execute(
+        select(Category.id, Category.name, Category.parent_id)
+        .where(Category.user_id == user_id)
+        .order_by(Category.name)
+    ).all()
+
+
+def get_deck_rows(db_session: Session, user_id: UUID):
+    return db_session.execute(
+        select(Deck.id, Deck.name, Deck.category_id)
+        .where(Deck.user_id == user_id)
+        .order_by(Deck.name)
+    ).all()
+
+
+def build_category_tree(
+    db_session: Session, user_id: UUID, include_counts: bool = False
+) -> CategoryTree:
+    categories = get_category_rows(db_session, user_id)
+
+    children_by_parent: Dict[Optional[UUID], List] = defaultdict(list)
+    for category in categories:
+        children_by_parent[category.parent_id].append(category)
+
+    deck_counts = (
+        get_deck_counts(db_session, user_id, datetime.now(timezone.utc))
+        if include_counts
+        else {}
+    )
+    decks_by_category: Dict[Optional[UUID], List[DeckSummary]] = defaultdict(list)
+    for deck in get_deck_rows(db_session, user_id):
+        summary = DeckSummary(id=deck.id, name=deck.name)
+        if include_counts:
+            counts = deck_counts.get(deck.id, DeckCounts())
+            summary.card_count = counts.card_count
+            summary.due_count = counts.due_count
+        decks_by_category[deck.category_id].append(summary)
+
+    def new_node(category, depth: int) -> CategoryNode:
+        decks = sorted(decks_by_category[category.id], key=lambda d: d.name)
+        node = CategoryNode(
+            id=category.id,
+            name=category.name,
+            decks=decks,
+            deck_count=len(decks),
+            depth=depth,
+        )
+        if include_counts:
+            node.card_count = sum(deck.card_count for deck in decks)
+            node.due_count = sum(deck.due_count for deck in decks)
+        return node
+
+    # Without recursion, a deep tree can't reach the recursion limit
+    root_categories = [new_node(category, 1) for category in children_by_parent[None]]
+    stack = list(zip(children_by_parent[None], root_categories))
+    visited: List[CategoryNode] = []
+    tree_depth = 0
+    total_decks = sum(len(decks) for decks in decks_by_category.values())
+    while stack:
+        category, node = stack.pop()
+        visited.append(node)
+        tree_depth = max(tree_depth, node.depth)
+        children = sorted(children_by_parent[category.id], key=lambda c: c.name)
+        node.children = [new_node(child, node.depth + 1) for child in children]
+        stack.extend(zip(children, node.children))
+
+    if include_counts:
+        # Children are visited after their parent, so backwards every child's
+        # counts are complete before they're added to its parent's
+        for node in reversed(visited):
+            for child in node.children:
+                node.card_count += child.card_count
+                node.due_count += child.due_count
+
+    return CategoryTree(
+        categories=root_categories,
+        uncategorized_decks=decks_by_category[None],
+        total_categories=len(categories),
+        total_decks=total_decks,
+        tree_depth=tree_depth,
+    )
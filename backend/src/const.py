@@ -1,3 +1,22 @@
 SCHEDULE_DEFAULT_EASE_FACTOR = 2.5
 SCHEDULE_DEFAULT_REPETITIONS = 0
 SCHEDULE_DEFAULT_INTERVAL = 1
+
+REVIEW_BATCH_MAX_SIZE = 500
+
+# Rows fetched per round trip when streaming cards
+CARDS_STREAM_BATCH_SIZE = 500
+
+STUDY_QUEUE_DEFAULT_SIZE = 20
+STUDY_QUEUE_MAX_SIZE = 100
+# Due cards are counted up to this many, past it the count is a lower bound
+STUDY_QUEUE_DUE_COUNT_CAP = 1000
+
+# Guests deleted per batch by src.db.purge, and rows deleted per statement
+GUEST_PURGE_BATCH_SIZE = 500
+GUEST_PURGE_CHUNK_SIZE = 5000
+GUEST_PURGE_LOCK_TIMEOUT = "2s"
+
+# Levels a recursive category query follows at most, so a cycle in the data
+# can't make it run forever
+CATEGORY_HIERARCHY_MAX_DEPTH = 1000
@@ -1,17 +1,81 @@
 from os import getenv
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.db.pool import PoolSettings
+
 DATABASE_URL = getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = getenv("DATABASE_REPLICA_URL")
+POOL_SETTINGS = PoolSettings.from_env()
 
-engine = create_engine(DATABASE_URL)
+# Batch executemany UPDATEs (e.g. cards touched by a review batch) into pages
+engine = create_engine(
+    DATABASE_URL,
+    executemany_mode="values_plus_batch",
+    **POOL_SETTINGS.engine_kwargs(),
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
 
 
+def get_async_database_url(database_url: str) -> str:
+    """The same database, reached through the asyncpg driver"""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Used by the async def endpoints, so that their queries don't block the
+# event loop. Nothing is expired on commit since attributes can't be lazily
+# reloaded outside of an await.
+async_engine = create_async_engine(
+    get_async_database_url(DATABASE_URL),
+    **POOL_SETTINGS.engine_kwargs(is_async=True),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+# Optional read replica for the read-only endpoints, see src.db.routing
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = None
+AsyncReplicaSessionLocal = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        DATABASE_REPLICA_URL, **POOL_SETTINGS.engine_kwargs()
+    )
+    ReplicaSessionLocal = sessionmaker(bind=replica_engine, autoflush=False)
+    async_replica_engine = create_async_engine(
+        get_async_database_url(DATABASE_REPLICA_URL),
+        **POOL_SETTINGS.engine_kwargs(is_async=True),
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine, autoflush=False, expire_on_commit=False
+    )
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    stats = {
+        "sync": engine.pool.stats(),
+        "async": async_engine.pool.stats(),
+    }
+    if DATABASE_REPLICA_URL:
+        stats["replica_sync"] = replica_engine.pool.stats()
+        stats["replica_async"] = async_replica_engine.pool.stats()
+    return stats
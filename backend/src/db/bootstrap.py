@@ -2,6 +2,7 @@ from uuid import UUID
 
 from sqlalchemy.orm import Session
 
+from src.categories.closure import add_to_closure
 from src.db import get_db
 from src.db.models import Category, UserRole
 from src.import_export import BaseImporter, store_imported_deck
@@ -14,7 +15,9 @@ CHINESE_DECK_JSON_PATH = "data/chinese.json"
 
 def add_category(user_id: UUID, name: str, db_session: Session) -> Category:
     category = Category(user_id=user_id, name=name)
-    category = category.save(db_session)
+    category = category.save(db_session, commit=False)
+    add_to_closure(db_session, category.id, None)
+    db_session.commit()
     return category
 
 
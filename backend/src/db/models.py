@@ -2,11 +2,29 @@ import uuid
 from datetime import datetime, timezone
 from enum import StrEnum
 
-import bcrypt
-from sqlalchemy import UUID, Boolean, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    ARRAY,
+    UUID,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    ScalarResult,
+    String,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Session, mapped_column, relationship
 
-from src.const import SCHEDULE_DEFAULT_EASE_FACTOR
+from src.auth.passwords import hash_password
+from src.const import (
+    SCHEDULE_DEFAULT_EASE_FACTOR,
+    SCHEDULE_DEFAULT_INTERVAL,
+    SCHEDULE_DEFAULT_REPETITIONS,
+)
 
 
 class Base(DeclarativeBase):
@@ -27,10 +45,18 @@ class BaseMixin:
         nullable=False,
     )
 
-    def save(self, db: Session):
+    def save(self, db: Session, commit: bool = True):
+        """Add the object to the session and commit it.
+
+        With commit=False the object is only flushed, so it joins the current
+        transaction and the caller commits once all of its changes are staged.
+        """
         db.add(self)
-        db.commit()
-        db.refresh(self)
+        if commit:
+            db.commit()
+            db.refresh(self)
+        else:
+            db.flush()
         return self
 
     def delete(self, db: Session):
@@ -49,6 +75,24 @@ class BaseMixin:
     def filter_by(cls, db: Session, **kwargs):
         return db.query(cls).filter_by(**kwargs)
 
+    async def save_async(self, db: AsyncSession, commit: bool = True):
+        """save() for an AsyncSession"""
+        db.add(self)
+        if commit:
+            await db.commit()
+            await db.refresh(self)
+        else:
+            await db.flush()
+        return self
+
+    @classmethod
+    async def get_async(cls, db: AsyncSession, id: UUID):
+        return await db.get(cls, id)
+
+    @classmethod
+    async def filter_by_async(cls, db: AsyncSession, **kwargs) -> ScalarResult:
+        return await db.scalars(select(cls).filter_by(**kwargs))
+
 
 class UserRole(StrEnum):
     GUEST = "guest"
@@ -83,9 +127,8 @@ class User(Base, BaseMixin):
     categories = relationship("Category", back_populates="user")
 
     def set_password(self, password: str):
-        pw_bytes = password.encode("utf-8")
-        pw_hashed = bcrypt.hashpw(pw_bytes, bcrypt.gensalt()).decode("utf-8")
-        self.password_hash = pw_hashed
+        """Hash the password inline, the API uses hash_password_async instead"""
+        self.password_hash = hash_password(password)
 
     def promote_to_user(
         self,
@@ -112,6 +155,18 @@ class User(Base, BaseMixin):
         return self.role == UserRole.ADMIN
 
 
+# Keyset pagination of the admin users list, see admin.get_users. Declared
+# outside of the class since created_at comes from BaseMixin.
+Index("ix_users_created_at_id", User.created_at.desc(), User.id)
+# Keyset walk over the guests, oldest first, see src.db.purge.purge_guests
+Index(
+    "ix_users_guests_created_at_id",
+    User.created_at,
+    User.id,
+    postgresql_where=User.role == UserRole.GUEST,
+)
+
+
 class Deck(Base, BaseMixin):
     __tablename__ = "decks"
 
@@ -128,14 +183,28 @@ class Deck(Base, BaseMixin):
 
     user = relationship("User", back_populates="decks")
     category = relationship("Category", back_populates="decks")
-    cards = relationship("Card", back_populates="deck", cascade="all, delete-orphan")
+    # The database deletes a deck's cards, the ORM doesn't load them for it
+    cards = relationship(
+        "Card",
+        back_populates="deck",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        Index("ix_decks_user_id_category_id", "user_id", "category_id"),
+        # Foreign key checks when categories are deleted
+        Index("ix_decks_category_id", "category_id"),
+    )
 
 
 class Card(Base, BaseMixin):
     __tablename__ = "cards"
 
     deck_id = mapped_column(
-        (UUID(as_uuid=True)), ForeignKey("decks.id"), nullable=False
+        (UUID(as_uuid=True)),
+        ForeignKey("decks.id", ondelete="CASCADE"),
+        nullable=False,
     )
     content = mapped_column(String)
     next_review_date = mapped_column(
@@ -143,11 +212,32 @@ class Card(Base, BaseMixin):
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+    # Scheduler state after the latest review, mirrors the latest Review row
+    repetitions = mapped_column(
+        Integer, default=SCHEDULE_DEFAULT_REPETITIONS, nullable=False
+    )
+    ease_factor = mapped_column(
+        Float, default=SCHEDULE_DEFAULT_EASE_FACTOR, nullable=False
+    )
+    interval = mapped_column(Integer, default=SCHEDULE_DEFAULT_INTERVAL, nullable=False)
+    last_reviewed_at = mapped_column(DateTime(timezone=True))
 
     deck = relationship("Deck", back_populates="cards")
 
+    __table_args__ = (
+        Index("ix_cards_deck_id_next_review_date", "deck_id", "next_review_date"),
+    )
+
 
 class Review(Base, BaseMixin):
+    """A review, kept as history when its card or deck is deleted.
+
+    That's why card_id and deck_id have no foreign keys, and why the card's
+    content and the deck's name are copied. The user's statistics keep
+    counting these reviews. They're only deleted with their user, see
+    src.db.purge.
+    """
+
     __tablename__ = "reviews"
 
     card_id = mapped_column((UUID(as_uuid=True)), nullable=False)
@@ -171,6 +261,12 @@ class Review(Base, BaseMixin):
 
     user = relationship("User", back_populates="reviews")
 
+    __table_args__ = (
+        # Latest review of a card, see create_review
+        Index("ix_reviews_card_id_reviewed_at", "card_id", reviewed_at.desc()),
+        Index("ix_reviews_user_id_reviewed_at", "user_id", "reviewed_at"),
+    )
+
     @property
     def succeeded(self):
         return self.feedback in {ReviewFeedback.OK}
@@ -180,6 +276,46 @@ class Review(Base, BaseMixin):
         return self.feedback in {ReviewFeedback.FORGOT}
 
 
+class ReviewCountsMixin:
+    total = mapped_column(Integer, default=0, nullable=False)
+    succeeded = mapped_column(Integer, default=0, nullable=False)
+    failed = mapped_column(Integer, default=0, nullable=False)
+    mature = mapped_column(Integer, default=0, nullable=False)
+    mature_succeeded = mapped_column(Integer, default=0, nullable=False)
+
+
+class UserDayStatistics(Base, ReviewCountsMixin):
+    """Review counts per user and UTC day, maintained alongside the reviews table"""
+
+    __tablename__ = "user_day_statistics"
+
+    user_id = mapped_column(
+        (UUID(as_uuid=True)), ForeignKey("users.id"), primary_key=True
+    )
+    day = mapped_column(Date, primary_key=True)
+
+
+class DeckReviewStatistics(Base, ReviewCountsMixin):
+    """Review counts per deck, maintained alongside the reviews table"""
+
+    __tablename__ = "deck_review_statistics"
+
+    deck_id = mapped_column(
+        (UUID(as_uuid=True)),
+        ForeignKey("decks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id = mapped_column(
+        (UUID(as_uuid=True)), ForeignKey("users.id"), nullable=False
+    )
+    last_studied = mapped_column(DateTime(timezone=True))
+    # Feedback of the most recent reviews, newest first
+    recent_feedback = mapped_column(ARRAY(String), default=list, nullable=False)
+
+    # Foreign key checks when users are deleted
+    __table_args__ = (Index("ix_deck_review_statistics_user_id", "user_id"),)
+
+
 class Category(Base, BaseMixin):
     __tablename__ = "categories"
 
@@ -199,20 +335,35 @@ class Category(Base, BaseMixin):
     children = relationship("Category", back_populates="parent")
     decks = relationship("Deck", back_populates="category")
 
+    # Foreign key checks when users or parent categories are deleted
+    __table_args__ = (
+        Index("ix_categories_user_id", "user_id"),
+        Index("ix_categories_parent_id", "parent_id"),
+    )
+
     @property
     def is_root(self):
         return self.parent_id is None
 
-    @property
-    def path(self):
-        if self.is_root:
-            return [self.name]
 
-        path_parts = []
-        current = self
+class CategoryClosure(Base):
+    """Every ancestor of every category, the category itself included at
+    depth 0. Maintained alongside the categories table, see
+    src.categories.closure"""
 
-        while current is not None:
-            path_parts.append(current.name)
-            current = current.parent
+    __tablename__ = "category_closure"
+
+    ancestor_id = mapped_column(
+        (UUID(as_uuid=True)),
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    descendant_id = mapped_column(
+        (UUID(as_uuid=True)),
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    depth = mapped_column(Integer, nullable=False)
 
-        return list(reversed(path_parts))
+    # Ancestor lookups, and foreign key checks when categories are deleted
+    __table_args__ = (Index("ix_category_closure_descendant_id", "descendant_id"),)
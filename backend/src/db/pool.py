@@ -0,0 +1,147 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+from os import getenv
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 30
+DEFAULT_POOL_RECYCLE = 1800
+
+
+def getenv_bool(name: str, default: bool = False) -> bool:
+    value = getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool settings, from the DB_* environment variables"""
+
+    size: int = DEFAULT_POOL_SIZE
+    max_overflow: int = DEFAULT_MAX_OVERFLOW
+    timeout: float = DEFAULT_POOL_TIMEOUT
+    recycle: int = DEFAULT_POOL_RECYCLE
+    pre_ping: bool = False
+    # PgBouncer in transaction pooling mode hands every transaction to any
+    # server connection, so prepared statements can't outlive a transaction
+    pgbouncer: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            size=int(getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            max_overflow=int(getenv("DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW)),
+            timeout=float(getenv("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)),
+            recycle=int(getenv("DB_POOL_RECYCLE", DEFAULT_POOL_RECYCLE)),
+            pre_ping=getenv_bool("DB_POOL_PRE_PING"),
+            pgbouncer=getenv_bool("DB_PGBOUNCER"),
+        )
+
+    def engine_kwargs(self, is_async: bool = False) -> dict:
+        kwargs = dict(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=self.size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.timeout,
+            pool_recycle=self.recycle,
+            pool_pre_ping=self.pre_ping,
+        )
+        # psycopg2 never prepares statements on the server, asyncpg does
+        if self.pgbouncer and is_async:
+            kwargs["connect_args"] = dict(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+            )
+        return kwargs
+
+
+@dataclass
+class PoolMetrics:
+    checkouts: int = 0
+    # Connections opened beyond the pool size, counted when the pool reserves
+    # their overflow slot, so one that then fails to connect is counted too
+    overflow_connections: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0
+    max_wait_seconds: float = 0
+
+
+class InstrumentedPoolMixin:
+    """Counts checkouts, how long they waited for a connection and the
+    overflow connections the pool opened for them.
+
+    The wait includes opening a new connection and the pre-ping, everything
+    between asking the pool for a connection and getting one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._metrics_lock = threading.Lock()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.metrics.timeouts += 1
+            raise
+
+        wait = time.perf_counter() - start
+        with self._metrics_lock:
+            self.metrics.checkouts += 1
+            self.metrics.total_wait_seconds += wait
+            self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, wait)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        # QueuePool._inc_overflow, also counting the connections that take the
+        # pool past its size. The count is made under the lock that raises the
+        # overflow, so concurrent checkouts can't see each other's connections.
+        with self._overflow_lock:
+            if self._max_overflow > -1 and self._overflow >= self._max_overflow:
+                return False
+            self._overflow += 1
+            is_overflow = self._overflow > 0
+        if is_overflow:
+            with self._metrics_lock:
+                self.metrics.overflow_connections += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            metrics = asdict(self.metrics)
+        checkouts = metrics["checkouts"]
+        return dict(
+            size=self.size(),
+            checked_out=self.checkedout(),
+            checked_in=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            max_overflow=self._max_overflow,
+            **metrics,
+            mean_wait_seconds=metrics["total_wait_seconds"] / checkouts
+            if checkouts
+            else 0,
+        )
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
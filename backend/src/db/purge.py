@@ -0,0 +1,239 @@
+"""Delete guests that have been inactive for a while, along with their data.
+
+Guests are purged in batches. Each batch's rows are deleted table by table,
+at most chunk_size rows per statement, and every statement commits on its
+own. No transaction runs long enough to hold locks that the app would wait on,
+and lock_timeout makes the purge give up instead of queueing behind the app.
+
+A guest counts as inactive when it was created before the cutoff and none of
+its reviews, decks, cards or categories are newer. The default age is the
+guest refresh token's lifetime, past which a guest can't sign back in. With
+a shorter age, a guest that comes back while being purged may lose its data.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, exists, func, inspect, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from src.auth.jwt import GUEST_REFRESH_TOKEN_EXPIRE_SECONDS
+from src.const import (
+    GUEST_PURGE_BATCH_SIZE,
+    GUEST_PURGE_CHUNK_SIZE,
+    GUEST_PURGE_LOCK_TIMEOUT,
+)
+from src.db import SessionLocal, get_db
+from src.db.models import (
+    Card,
+    Category,
+    Deck,
+    DeckReviewStatistics,
+    Review,
+    User,
+    UserDayStatistics,
+    UserRole,
+)
+from src.log import set_up_logger
+
+GUEST_PURGE_DEFAULT_AGE = timedelta(seconds=GUEST_REFRESH_TOKEN_EXPIRE_SECONDS)
+
+
+@dataclass
+class PurgeResult:
+    guests: int = 0
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0
+
+    def add_rows(self, table: str, count: int):
+        self.rows[table] = self.rows.get(table, 0) + count
+
+
+def inactive_guests_query(cutoff: datetime):
+    return select(User.id, User.created_at).where(
+        User.role == UserRole.GUEST,
+        User.created_at < cutoff,
+        ~exists().where(Review.user_id == User.id, Review.reviewed_at >= cutoff),
+        ~exists().where(Deck.user_id == User.id, Deck.updated_at >= cutoff),
+        ~exists().where(
+            Card.deck_id == Deck.id, Deck.user_id == User.id, Card.updated_at >= cutoff
+        ),
+        ~exists().where(Category.user_id == User.id, Category.updated_at >= cutoff),
+    )
+
+
+def guest_batch_query(query, after: Optional[tuple], batch_size: int):
+    """The next batch_size guests of query created after the after keyset"""
+    batch_query = query.order_by(User.created_at, User.id).limit(batch_size)
+    if after:
+        batch_query = batch_query.where(tuple_(User.created_at, User.id) > after)
+    return batch_query
+
+
+def set_lock_timeout(db_session: Session):
+    db_session.execute(text(f"SET LOCAL lock_timeout = '{GUEST_PURGE_LOCK_TIMEOUT}'"))
+
+
+def delete_in_chunks(db_session: Session, model, where, chunk_size: int) -> int:
+    """Delete the rows matching where, chunk_size rows per transaction"""
+    primary_key = tuple_(*inspect(model).primary_key)
+    deleted = 0
+    while True:
+        chunk = select(*inspect(model).primary_key).where(where).limit(chunk_size)
+        set_lock_timeout(db_session)
+        count = db_session.execute(
+            delete(model)
+            .where(primary_key.in_(chunk))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db_session.commit()
+        deleted += count
+        if count < chunk_size:
+            return deleted
+
+
+def purge_guest_batch(
+    db_session: Session, user_ids: List[UUID], chunk_size: int, result: PurgeResult
+):
+    guest_decks = select(Deck.id).where(Deck.user_id.in_(user_ids)).scalar_subquery()
+    # Children first, every foreign key still points at an existing row
+    for model, where in [
+        (Review, Review.user_id.in_(user_ids)),
+        (UserDayStatistics, UserDayStatistics.user_id.in_(user_ids)),
+        (DeckReviewStatistics, DeckReviewStatistics.deck_id.in_(guest_decks)),
+        (Card, Card.deck_id.in_(guest_decks)),
+        (Deck, Deck.user_id.in_(user_ids)),
+    ]:
+        result.add_rows(
+            model.__tablename__,
+            delete_in_chunks(db_session, model, where, chunk_size),
+        )
+
+    # Categories reference their parents, so a chunk could split a subtree.
+    # They go in one statement per batch, guests rarely have many.
+    set_lock_timeout(db_session)
+    result.add_rows(
+        Category.__tablename__,
+        db_session.execute(
+            delete(Category)
+            .where(Category.user_id.in_(user_ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount,
+    )
+    db_session.commit()
+
+    # Only guests, in case one was promoted since the batch was selected
+    set_lock_timeout(db_session)
+    deleted_users = db_session.execute(
+        delete(User)
+        .where(User.id.in_(user_ids), User.role == UserRole.GUEST)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db_session.commit()
+    result.guests += deleted_users
+    result.add_rows(User.__tablename__, deleted_users)
+
+
+def purge_guests(
+    db_session: Session,
+    older_than: timedelta = GUEST_PURGE_DEFAULT_AGE,
+    batch_size: int = GUEST_PURGE_BATCH_SIZE,
+    chunk_size: int = GUEST_PURGE_CHUNK_SIZE,
+    dry_run: bool = False,
+) -> PurgeResult:
+    """Delete guests inactive for older_than, batch_size guests at a time.
+
+    With dry_run, the guests are only counted.
+    """
+    start = time.perf_counter()
+    cutoff = datetime.now(timezone.utc) - older_than
+    result = PurgeResult()
+    query = inactive_guests_query(cutoff)
+
+    if dry_run:
+        result.guests = db_session.scalar(
+            select(func.count()).select_from(query.subquery())
+        )
+        db_session.commit()
+        result.seconds = time.perf_counter() - start
+        return result
+
+    # Walk ix_users_guests_created_at_id, skipping the guests that were kept
+    after: Optional[tuple] = None
+    while True:
+        batch = db_session.execute(guest_batch_query(query, after, batch_size)).all()
+        db_session.commit()
+        if not batch:
+            break
+
+        purge_guest_batch(db_session, [row.id for row in batch], chunk_size, result)
+        after = (batch[-1].created_at, batch[-1].id)
+        logging.debug(f"Purged guests created up to {after[0]}")
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def log_purge_result(result: PurgeResult):
+    rows = ", ".join(f"{count} {table}" for table, count in result.rows.items())
+    logging.info(
+        f"Purged {result.guests} guests in {result.seconds:.2f}s"
+        + (f" ({rows})" if rows else "")
+    )
+
+
+async def purge_guests_periodically(interval_seconds: float):
+    """Run purge_guests every interval_seconds, for the app's lifespan"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = await asyncio.to_thread(run_purge_guests)
+            log_purge_result(result)
+        except Exception:
+            logging.exception("Guest purge failed")
+
+
+def run_purge_guests(**kwargs) -> PurgeResult:
+    with SessionLocal() as db_session:
+        return purge_guests(db_session, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete inactive guest users")
+    parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=GUEST_PURGE_DEFAULT_AGE / timedelta(days=1),
+        help="Purge guests inactive for this many days",
+    )
+    parser.add_argument("--batch-size", type=int, default=GUEST_PURGE_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=GUEST_PURGE_CHUNK_SIZE)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count the guests to purge"
+    )
+    args = parser.parse_args()
+
+    with next(get_db()) as db_session:
+        result = purge_guests(
+            db_session,
+            older_than=timedelta(days=args.older_than_days),
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            dry_run=args.dry_run,
+        )
+
+    if args.dry_run:
+        logging.info(f"{result.guests} guests would be purged")
+    else:
+        log_purge_result(result)
+
+
+if __name__ == "__main__":
+    set_up_logger()
+    main()
@@ -0,0 +1,77 @@
+"""Send read-only endpoints to the read replica, if there is one.
+
+Endpoints that only read depend on get_read_db (or get_async_read_db) rather
+than get_db. Without DATABASE_REPLICA_URL that is the primary session itself.
+
+Replication lags behind the primary, so a client that has just written could
+read stale data from the replica. PrimaryStickinessMiddleware stores the time
+of a client's last successful write in its session cookie, and its reads go to
+the primary until DATABASE_REPLICA_STICKY_SECONDS have passed.
+"""
+
+import time
+from os import getenv
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import src.db
+from src.db import get_async_db, get_db
+
+LAST_WRITE_SESSION_KEY = "db_last_write"
+REPLICA_STICKY_SECONDS = float(getenv("DATABASE_REPLICA_STICKY_SECONDS", 5))
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def reads_from_primary(request: Request) -> bool:
+    last_write = request.session.get(LAST_WRITE_SESSION_KEY)
+    return last_write is not None and time.time() - last_write < REPLICA_STICKY_SECONDS
+
+
+def get_read_db(request: Request, db_session: Session = Depends(get_db)):
+    # The module attribute is looked up per request so tests can swap it
+    if src.db.ReplicaSessionLocal is None or reads_from_primary(request):
+        yield db_session
+        return
+
+    replica_session = src.db.ReplicaSessionLocal()
+    try:
+        yield replica_session
+    finally:
+        replica_session.close()
+
+
+async def get_async_read_db(
+    request: Request, db_session: AsyncSession = Depends(get_async_db)
+):
+    if src.db.AsyncReplicaSessionLocal is None or reads_from_primary(request):
+        yield db_session
+        return
+
+    async with src.db.AsyncReplicaSessionLocal() as replica_session:
+        yield replica_session
+
+
+class PrimaryStickinessMiddleware:
+    """Remember when a client last wrote, so get_read_db can pin it to the
+    primary. Must run inside SessionMiddleware."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or src.db.ReplicaSessionLocal is None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                scope["session"][LAST_WRITE_SESSION_KEY] = time.time()
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
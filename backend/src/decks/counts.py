@@ -0,0 +1,56 @@
+"""Card counts per deck, for all of a user's decks in one grouped query."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.db.models import Card, Deck
+
+
+@dataclass
+class DeckCounts:
+    card_count: int = 0
+    # Cards whose next review is due by now, like in the study queue
+    due_count: int = 0
+    # Cards that were never reviewed
+    new_count: int = 0
+    last_reviewed_at: Optional[datetime] = None
+
+
+def deck_counts_columns(now: datetime) -> list:
+    """Aggregates of the cards joined to each deck, named like DeckCounts.
+
+    They count Card.id, so that a deck left joined to no cards counts 0.
+    """
+    return [
+        func.count(Card.id).label("card_count"),
+        func.count(Card.id).filter(Card.next_review_date <= now).label("due_count"),
+        func.count(Card.id).filter(Card.last_reviewed_at.is_(None)).label("new_count"),
+        func.max(Card.last_reviewed_at).label("last_reviewed_at"),
+    ]
+
+
+def deck_counts_from_row(row) -> DeckCounts:
+    return DeckCounts(
+        card_count=row.card_count,
+        due_count=row.due_count,
+        new_count=row.new_count,
+        last_reviewed_at=row.last_reviewed_at,
+    )
+
+
+def get_deck_counts(
+    db_session: Session, user_id: UUID, now: datetime
+) -> Dict[UUID, DeckCounts]:
+    """The counts of the user's decks that have cards, by deck id"""
+    rows = db_session.execute(
+        select(Card.deck_id, *deck_counts_columns(now))
+        .join(Deck, Deck.id == Card.deck_id)
+        .where(Deck.user_id == user_id)
+        .group_by(Card.deck_id)
+    ).all()
+    return {row.deck_id: deck_counts_from_row(row) for row in rows}
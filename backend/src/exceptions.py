@@ -1,3 +1,7 @@
 class RefreshTokenAuthenticationError(Exception):
     def __init__(self, detail: str):
         self.detail = detail
+
+
+class PasswordHashingBusyError(Exception):
+    """Too many passwords are already being hashed or checked"""
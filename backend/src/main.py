@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from os import getenv
@@ -20,10 +21,13 @@ from src.api import (
     oauth,
     reviews,
     statistics,
+    study,
 )
 from src.db import get_db
 from src.db.models import User, UserRole
-from src.exceptions import RefreshTokenAuthenticationError
+from src.db.purge import purge_guests_periodically
+from src.db.routing import PrimaryStickinessMiddleware
+from src.exceptions import PasswordHashingBusyError, RefreshTokenAuthenticationError
 from src.log import set_up_logger
 from src.util import add_user
 
@@ -34,6 +38,8 @@ frontend_url = getenv("FRONTEND_URL")
 assert frontend_url, "FRONTEND_URL must be set"
 origins = [frontend_url]
 
+guest_purge_interval = getenv("GUEST_PURGE_INTERVAL_SECONDS")
+
 
 # Add an admin user on startup
 @asynccontextmanager
@@ -49,8 +55,18 @@ async def lifespan(app: FastAPI):
         else:
             add_user(admin_email, admin_password, UserRole.ADMIN, db_session)
 
+    # Optionally purge inactive guests from this process, see src.db.purge
+    purge_task = None
+    if guest_purge_interval:
+        purge_task = asyncio.create_task(
+            purge_guests_periodically(float(guest_purge_interval))
+        )
+
     yield
 
+    if purge_task:
+        purge_task.cancel()
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -65,6 +81,17 @@ async def authentication_error_handler(
     return response
 
 
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(
+    request: Request, exc: PasswordHashingBusyError
+):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     error_msg = exc.errors()[0].get("msg")
@@ -74,6 +101,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+# Added first so that it runs inside SessionMiddleware
+app.add_middleware(PrimaryStickinessMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -93,6 +122,7 @@ app.include_router(oauth.router)
 app.include_router(me.router)
 app.include_router(reviews.router)
 app.include_router(statistics.router)
+app.include_router(study.router)
 app.include_router(categories.router)
 app.include_router(healthcheck.router)
 app.include_router(admin.router)
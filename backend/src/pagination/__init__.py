@@ -1,13 +1,27 @@
+import base64
+import json
+from datetime import datetime
 from math import ceil
-from typing import List, TypeVar
+from typing import List, Optional, TypeVar
+from uuid import UUID
 
 from fastapi import Query
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
 
-from src.schemas.pagination import PaginatedResponse, PaginationParams
+from src.schemas.pagination import (
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    PaginationMode,
+    PaginationParams,
+)
 
 T = TypeVar("T")
 
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
 
 def create_paginated_response(
     items: List[T], total: int, page: int, size: int
@@ -29,6 +43,69 @@ def create_paginated_response(
     )
 
 
+class SortKey:
+    """One ORDER BY column of a keyset paginated query"""
+
+    def __init__(self, order_by):
+        self.descending = getattr(order_by, "modifier", None) is operators.desc_op
+        self.column = order_by.element if hasattr(order_by, "modifier") else order_by
+        self.key = self.column.key
+        self.python_type = self.column.type.python_type
+        # Dates, UUIDs and enums are sent as strings in the cursor
+        if issubclass(self.python_type, (datetime, UUID, str)):
+            self.json_type = str
+        elif self.python_type is float:
+            self.json_type = (int, float)
+        else:
+            self.json_type = self.python_type
+
+    def order_by(self, reverse: bool):
+        return self.column.asc() if self.descending == reverse else self.column.desc()
+
+    def after(self, value, reverse: bool):
+        """Condition for rows sorted after value (before it if reverse)"""
+        if self.descending == reverse:
+            return self.column > value
+        return self.column < value
+
+    def encode(self, value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+    def decode(self, value):
+        """Raises ValueError if value isn't of the key's type in the cursor"""
+        # bool is an int too, but never a valid value for a number key
+        if not isinstance(value, self.json_type) or (
+            isinstance(value, bool) and self.python_type is not bool
+        ):
+            raise ValueError("Invalid cursor")
+        if self.python_type is datetime:
+            return datetime.fromisoformat(value)
+        if self.python_type is UUID:
+            return UUID(value)
+        return value
+
+
+def encode_cursor(direction: str, values: list) -> str:
+    payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, list]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        direction, values = payload["d"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if direction not in {CURSOR_NEXT, CURSOR_PREV} or not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return direction, values
+
+
 class PaginationService:
     def __init__(self, db: Session):
         self.db = db
@@ -41,9 +118,131 @@ class PaginationService:
 
         return create_paginated_response(items, total, page, size)
 
+    def paginate_cursor(
+        self,
+        query,
+        order_by: list,
+        size: int,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+    ) -> CursorPaginatedResponse:
+        """Keyset pagination, seeks past the cursor instead of using OFFSET.
+
+        order_by must end with a unique column (e.g. the id) so that every row
+        has a distinct position. The query itself must not be ordered yet.
+        Raises ValueError if the cursor is malformed.
+        """
+        keys = [SortKey(column) for column in order_by]
+        total = query.count() if include_total else None
+
+        direction, values = CURSOR_NEXT, None
+        if cursor:
+            direction, encoded = decode_cursor(cursor)
+            if len(encoded) != len(keys):
+                raise ValueError("Invalid cursor")
+            try:
+                values = [key.decode(value) for key, value in zip(keys, encoded)]
+            except (ValueError, TypeError):
+                raise ValueError("Invalid cursor")
+
+        reverse = direction == CURSOR_PREV
+        if values is not None:
+            # (a, b) after (x, y) <=> a after x or (a = x and b after y), which
+            # also works when the columns are sorted in different directions
+            query = query.filter(
+                or_(
+                    *[
+                        and_(
+                            *[
+                                key.column == value
+                                for key, value in zip(keys[:i], values[:i])
+                            ],
+                            keys[i].after(values[i], reverse),
+                        )
+                        for i in range(len(keys))
+                    ]
+                )
+            )
+
+        rows = (
+            query.order_by(*[key.order_by(reverse) for key in keys])
+            .limit(size + 1)
+            .all()
+        )
+        has_more = len(rows) > size
+        items = rows[:size]
+        if reverse:
+            items.reverse()
+
+        has_next = has_more if not reverse else True
+        has_prev = has_more if reverse else values is not None
+
+        def cursor_at(item, direction: str) -> str:
+            return encode_cursor(
+                direction, [key.encode(getattr(item, key.key)) for key in keys]
+            )
+
+        return CursorPaginatedResponse(
+            items=items,
+            size=size,
+            has_next=has_next,
+            has_prev=has_prev,
+            next_cursor=cursor_at(items[-1], CURSOR_NEXT)
+            if has_next and items
+            else None,
+            prev_cursor=cursor_at(items[0], CURSOR_PREV)
+            if has_prev and items
+            else None,
+            total=total,
+        )
+
+    def paginate_params(
+        self, query, order_by: list, pagination: PaginationParams
+    ) -> PaginatedResponse | CursorPaginatedResponse:
+        """Paginate in the mode requested by the client"""
+        if pagination.mode == PaginationMode.CURSOR:
+            return self.paginate_cursor(
+                query,
+                order_by,
+                pagination.size,
+                cursor=pagination.cursor,
+                include_total=pagination.include_total,
+            )
+        return self.paginate(
+            query.order_by(*order_by), pagination.page, pagination.size
+        )
+
 
 def get_pagination_params(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Items per page"),
+    mode: Optional[PaginationMode] = Query(
+        None, description="Pagination mode, cursor if a cursor is given"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(
+        False, description="Count all items in cursor mode, this is slow"
+    ),
 ) -> PaginationParams:
-    return PaginationParams(page=page, size=size)
+    if mode is None:
+        mode = PaginationMode.CURSOR if cursor else PaginationMode.PAGE
+    return PaginationParams(
+        page=page, size=size, mode=mode, cursor=cursor, include_total=include_total
+    )
+
+
+def get_optional_pagination_params(
+    page: Optional[int] = Query(None, ge=1, description="Page number"),
+    size: int = Query(20, ge=1, le=100, description="Items per page"),
+    mode: Optional[PaginationMode] = Query(
+        None, description="Pagination mode, cursor if a cursor is given"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(
+        False, description="Count all items in cursor mode, this is slow"
+    ),
+) -> Optional[PaginationParams]:
+    """For endpoints that return every item unless a page is asked for"""
+    if page is None and mode is None and cursor is None:
+        return None
+    return get_pagination_params(page or 1, size, mode, cursor, include_total)
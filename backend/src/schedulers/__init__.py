@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 from src.db.models import ReviewFeedback
 
@@ -21,5 +22,6 @@ class Scheduler(ABC):
         repetitions: int,
         ease_factor: float,
         interval: int,
+        reviewed_at: Optional[datetime] = None,
     ) -> ScheduleResult:
         pass
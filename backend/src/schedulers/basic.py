@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from src.db.models import ReviewFeedback
 from src.schedulers import Scheduler, ScheduleResult
@@ -11,13 +12,16 @@ class BasicScheduler(Scheduler):
         repetitions: int,
         ease_factor: float,
         interval: int,
+        reviewed_at: Optional[datetime] = None,
     ):
+        reviewed_at = reviewed_at or datetime.now(timezone.utc)
+
         if feedback == ReviewFeedback.SKIPPED:
             return ScheduleResult(
                 interval=interval,
                 ease_factor=ease_factor,
                 repetitions=repetitions,
-                next_review_date=datetime.now(timezone.utc) + timedelta(days=1),
+                next_review_date=reviewed_at + timedelta(days=1),
             )
 
         if feedback == ReviewFeedback.FORGOT:
@@ -25,7 +29,7 @@ class BasicScheduler(Scheduler):
                 interval=1,
                 ease_factor=max(1.3, ease_factor - 0.2),
                 repetitions=0,
-                next_review_date=datetime.now(timezone.utc) + timedelta(days=1),
+                next_review_date=reviewed_at + timedelta(days=1),
             )
 
         if feedback == ReviewFeedback.OK:
@@ -45,5 +49,5 @@ class BasicScheduler(Scheduler):
             interval=interval,
             ease_factor=ease_factor,
             repetitions=repetitions,
-            next_review_date=datetime.now(timezone.utc) + timedelta(days=interval),
+            next_review_date=reviewed_at + timedelta(days=interval),
         )
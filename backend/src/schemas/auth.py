@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class TokenCacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    expired: int
+    evictions: int
+    hit_rate: float
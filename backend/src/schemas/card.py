@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from enum import StrEnum
 from typing import Optional
 from uuid import UUID
 
@@ -7,6 +8,11 @@ from pydantic import BaseModel
 from src.db.models import Card
 
 
+class CardOrder(StrEnum):
+    NEXT_REVIEW_DATE = "next_review_date"
+    CREATED_AT = "created_at"
+
+
 class CardCreate(BaseModel):
     deck_id: UUID
     content: str
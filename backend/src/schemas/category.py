@@ -34,6 +34,9 @@ class CategoryUpdate(BaseModel):
 class DeckSummary(BaseModel):
     id: UUID
     name: str
+    # Only with include_counts
+    card_count: Optional[int] = None
+    due_count: Optional[int] = None
 
 
 class CategoryNode(BaseModel):
@@ -43,6 +46,9 @@ class CategoryNode(BaseModel):
     children: List[CategoryNode] = []
     deck_count: int = 0
     depth: int = 0
+    # Only with include_counts, these include the decks of every descendant
+    card_count: Optional[int] = None
+    due_count: Optional[int] = None
 
 
 class CategoryTree(BaseModel):
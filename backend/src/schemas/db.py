@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    overflow_connections: int
+    timeouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+    mean_wait_seconds: float
@@ -1,9 +1,13 @@
+from dataclasses import asdict
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel
 
+from src.db.models import Deck
+from src.decks.counts import DeckCounts
+
 
 class DeckCreate(BaseModel):
     name: str
@@ -23,6 +27,20 @@ class DeckOut(BaseModel):
     updated_at: datetime
 
 
+class DeckWithCountsOut(DeckOut):
+    card_count: int
+    due_count: int
+    new_count: int
+    last_reviewed_at: Optional[datetime] = None
+
+    @classmethod
+    def from_deck(cls, deck: Deck, counts: DeckCounts) -> "DeckWithCountsOut":
+        return cls(
+            **DeckOut.model_validate(deck, from_attributes=True).model_dump(),
+            **asdict(counts),
+        )
+
+
 class DeckUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = ""
@@ -1,10 +1,16 @@
+from enum import StrEnum
 from typing import Generic, List, Optional, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 T = TypeVar("T")
 
 
+class PaginationMode(StrEnum):
+    PAGE = "page"
+    CURSOR = "cursor"
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
     total: int
@@ -17,9 +23,28 @@ class PaginatedResponse(BaseModel, Generic[T]):
     prev_page: Optional[int] = None
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    # Keeps page mode responses from validating as cursor ones when both are
+    # allowed as a response model
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[T]
+    size: int
+    has_next: bool
+    has_prev: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number, starting from 1")
     size: int = Field(20, ge=1, le=100, description="Number of items per page")
+    mode: PaginationMode = Field(PaginationMode.PAGE, description="Pagination mode")
+    cursor: Optional[str] = Field(None, description="Cursor from a previous page")
+    include_total: bool = Field(
+        False, description="Count all items in cursor mode, this is slow"
+    )
 
     @property
     def offset(self) -> int:
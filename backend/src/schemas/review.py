@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from src.const import REVIEW_BATCH_MAX_SIZE
 from src.db.models import ReviewFeedback
 
 
@@ -26,3 +28,21 @@ class ReviewOut(BaseModel):
     created_at: datetime
     succeeded: bool
     failed: bool
+
+
+class ReviewBatchItem(BaseModel):
+    card_id: UUID
+    feedback: ReviewFeedback
+    reviewed_at: Optional[datetime] = None
+
+
+class ReviewBatchCreate(BaseModel):
+    reviews: List[ReviewBatchItem] = Field(
+        ..., min_length=1, max_length=REVIEW_BATCH_MAX_SIZE
+    )
+
+
+class ReviewBatchResult(BaseModel):
+    card_id: UUID
+    review: Optional[ReviewOut] = None
+    error: Optional[str] = None
@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from src.schemas.card import CardOut
+
+
+class StudyQueueOut(BaseModel):
+    cards: List[CardOut]
+    due_count: int
+    due_count_capped: bool
@@ -1,11 +1,16 @@
 from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import StrEnum
-from typing import List
+from typing import Dict, List
+from uuid import UUID
 
 from src.db.models import Deck, Review
 from src.schemas.statistics import DeckStatistics
 
+MATURE_INTERVAL_THRESHOLD = 21
+RECENT_REVIEWS_WINDOW = 10
+
 
 class DifficultyRankings(StrEnum):
     MASTERED = "mastered"
@@ -14,6 +19,28 @@ class DifficultyRankings(StrEnum):
     NEW = "new"
 
 
+@dataclass
+class ReviewCounts:
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    mature: int = 0
+    mature_succeeded: int = 0
+
+    @property
+    def success_rate(self) -> float:
+        graded = self.succeeded + self.failed
+        if not graded:
+            return 0.0
+        return self.succeeded / graded
+
+    @property
+    def retention_rate(self) -> float:
+        if not self.mature:
+            return 0.0
+        return self.mature_succeeded / self.mature
+
+
 def calculate_daily_reviews(review_dates: List[datetime]):
     daily_reviews = defaultdict(int)
     for dt in review_dates:
@@ -42,7 +69,7 @@ def calculate_streak(start: datetime, dates: list[datetime]) -> int:
 
 
 def calculate_retention_rate(
-    reviews: List[Review], mature_interval_threshold: int = 21
+    reviews: List[Review], mature_interval_threshold: int = MATURE_INTERVAL_THRESHOLD
 ) -> float:
     mature_reviews = [
         review for review in reviews if review.interval >= mature_interval_threshold
@@ -68,14 +95,23 @@ def calculate_success_rate(reviews: List[Review]) -> float:
 
 
 def classify_deck_difficulty(reviews: List[Review]) -> str:
-    if len(reviews) < 5:
-        return DifficultyRankings.NEW
+    recent_reviews = reviews[-RECENT_REVIEWS_WINDOW:]
+    return rank_difficulty(
+        len(reviews),
+        calculate_success_rate(reviews),
+        calculate_retention_rate(reviews),
+        calculate_success_rate(recent_reviews),
+    )
 
-    success_rate = calculate_success_rate(reviews)
-    retention_rate = calculate_retention_rate(reviews)
 
-    recent_reviews = reviews[-10:] if len(reviews) >= 10 else reviews
-    recent_success_rate = calculate_success_rate(recent_reviews)
+def rank_difficulty(
+    total_reviews: int,
+    success_rate: float,
+    retention_rate: float,
+    recent_success_rate: float,
+) -> str:
+    if total_reviews < 5:
+        return DifficultyRankings.NEW
 
     if success_rate >= 0.85 and retention_rate >= 0.80 and recent_success_rate >= 0.80:
         return DifficultyRankings.MASTERED
@@ -85,9 +121,24 @@ def classify_deck_difficulty(reviews: List[Review]) -> str:
         return DifficultyRankings.LEARNING
 
 
-def get_deck_statistics(deck: Deck, user_reviews: List[Review]) -> DeckStatistics:
-    deck_reviews = [review for review in user_reviews if review.deck_id == deck.id]
+def group_reviews_by_deck(reviews: List[Review]) -> Dict[UUID, List[Review]]:
+    reviews_by_deck = defaultdict(list)
+    for review in reviews:
+        reviews_by_deck[review.deck_id].append(review)
+    return reviews_by_deck
+
+
+def get_decks_statistics(
+    decks: List[Deck], user_reviews: List[Review]
+) -> List[DeckStatistics]:
+    # Partition once instead of filtering all the reviews for every deck
+    reviews_by_deck = group_reviews_by_deck(user_reviews)
+    return [
+        get_deck_statistics(deck, reviews_by_deck.get(deck.id, [])) for deck in decks
+    ]
+
 
+def get_deck_statistics(deck: Deck, deck_reviews: List[Review]) -> DeckStatistics:
     if not deck_reviews:
         return DeckStatistics(
             deck_id=str(deck.id),
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Deck, DeckReviewStatistics, ReviewFeedback, UserDayStatistics
+from src.schemas.statistics import DeckStatistics
+from src.statistics import ReviewCounts, rank_difficulty
+
+
+@dataclass
+class UserReviewSummary:
+    counts: ReviewCounts = field(default_factory=ReviewCounts)
+    daily_reviews: Dict[str, int] = field(default_factory=dict)
+    streak: int = 0
+
+
+def review_counts_from_row(row) -> ReviewCounts:
+    return ReviewCounts(
+        total=row.total or 0,
+        succeeded=row.succeeded or 0,
+        failed=row.failed or 0,
+        mature=row.mature or 0,
+        mature_succeeded=row.mature_succeeded or 0,
+    )
+
+
+async def query_user_review_summary(
+    db_session: AsyncSession, user_id: UUID, today: date
+) -> UserReviewSummary:
+    """Per-day review counts, overall counts and the current streak in one query.
+
+    Reads one rollup row per day with reviews. The streak is computed with the
+    gaps-and-islands trick: within consecutive days ordered newest first,
+    day + row_number() is constant, so each streak is one window partition.
+    """
+    daily = (
+        select(UserDayStatistics).where(UserDayStatistics.user_id == user_id).subquery()
+    )
+
+    is_past = daily.c.day <= today
+    islands = select(
+        daily,
+        is_past.label("is_past"),
+        (
+            daily.c.day
+            + cast(
+                func.row_number().over(
+                    partition_by=is_past, order_by=daily.c.day.desc()
+                ),
+                Integer,
+            )
+        ).label("island"),
+    ).subquery()
+
+    rows = (
+        await db_session.execute(
+            select(
+                islands,
+                func.count()
+                .over(partition_by=[islands.c.is_past, islands.c.island])
+                .label("island_length"),
+            ).order_by(islands.c.day.desc())
+        )
+    ).all()
+
+    summary = UserReviewSummary()
+    for row in rows:
+        counts = review_counts_from_row(row)
+        summary.counts.total += counts.total
+        summary.counts.succeeded += counts.succeeded
+        summary.counts.failed += counts.failed
+        summary.counts.mature += counts.mature
+        summary.counts.mature_succeeded += counts.mature_succeeded
+        summary.daily_reviews[row.day.isoformat()] = counts.total
+
+    latest = next((row for row in rows if row.is_past), None)
+    # Don't penalize the streak if there are no reviews today yet
+    if latest and latest.day >= today - timedelta(days=1):
+        summary.streak = latest.island_length
+
+    return summary
+
+
+async def query_deck_statistics(
+    db_session: AsyncSession, user_id: UUID, deck_id: Optional[UUID] = None
+) -> List[DeckStatistics]:
+    """Statistics for every deck of the user (or a single deck) in one query.
+
+    Decks of other users are never returned, so an empty list for a deck_id
+    means that the deck doesn't exist or isn't the user's.
+    """
+    query = (
+        select(Deck.id, Deck.name, DeckReviewStatistics)
+        .outerjoin(DeckReviewStatistics, DeckReviewStatistics.deck_id == Deck.id)
+        .where(Deck.user_id == user_id)
+    )
+    if deck_id:
+        query = query.where(Deck.id == deck_id)
+
+    deck_statistics = []
+    for row_deck_id, deck_name, rollup in (await db_session.execute(query)).all():
+        counts = review_counts_from_row(rollup) if rollup else ReviewCounts()
+        recent_feedback = rollup.recent_feedback if rollup else []
+        recent_counts = ReviewCounts(
+            succeeded=recent_feedback.count(ReviewFeedback.OK),
+            failed=recent_feedback.count(ReviewFeedback.FORGOT),
+        )
+        deck_statistics.append(
+            DeckStatistics(
+                deck_id=str(row_deck_id),
+                deck_name=deck_name,
+                retention_rate="{:.2f}".format(counts.retention_rate),
+                total_reviews=counts.total,
+                last_studied=rollup.last_studied if rollup else None,
+                difficulty_ranking=rank_difficulty(
+                    counts.total,
+                    counts.success_rate,
+                    counts.retention_rate,
+                    recent_counts.success_rate,
+                ),
+            )
+        )
+
+    return deck_statistics
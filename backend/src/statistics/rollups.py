@@ -0,0 +1,239 @@
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Date, and_, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.orm import Session
+
+from src.db import get_db
+from src.db.models import (
+    Deck,
+    DeckReviewStatistics,
+    Review,
+    ReviewFeedback,
+    UserDayStatistics,
+)
+from src.log import set_up_logger
+from src.statistics import MATURE_INTERVAL_THRESHOLD, RECENT_REVIEWS_WINDOW
+
+COUNT_COLUMNS = ["total", "succeeded", "failed", "mature", "mature_succeeded"]
+DAY_STATISTICS_COLUMNS = ["user_id", "day", *COUNT_COLUMNS]
+DECK_STATISTICS_COLUMNS = [
+    "deck_id",
+    "user_id",
+    *COUNT_COLUMNS,
+    "last_studied",
+    "recent_feedback",
+]
+
+SUCCEEDED = Review.feedback == ReviewFeedback.OK
+FAILED = Review.feedback == ReviewFeedback.FORGOT
+MATURE = Review.interval >= MATURE_INTERVAL_THRESHOLD
+
+
+@dataclass
+class StatisticsDrift:
+    day_rows: int
+    deck_rows: int
+
+    @property
+    def drifted(self) -> bool:
+        return bool(self.day_rows or self.deck_rows)
+
+
+def _add_review_counts(row: dict, review: Review):
+    mature = review.interval >= MATURE_INTERVAL_THRESHOLD
+    row["total"] += 1
+    row["succeeded"] += int(review.succeeded)
+    row["failed"] += int(review.failed)
+    row["mature"] += int(mature)
+    row["mature_succeeded"] += int(mature and review.succeeded)
+
+
+def record_reviews(db_session: Session, reviews: List[Review]):
+    """Add reviews to the statistics rollups.
+
+    Runs in the caller's transaction, so the rollups are committed (or rolled
+    back) together with the reviews themselves. The reviews are folded per day
+    and per deck first so that every rollup row is upserted once.
+    """
+    if not reviews:
+        return
+
+    days = {}
+    decks = {}
+    for review in sorted(reviews, key=lambda review: review.reviewed_at, reverse=True):
+        day = review.reviewed_at.astimezone(timezone.utc).date()
+        day_row = days.setdefault(
+            (review.user_id, day),
+            dict(user_id=review.user_id, day=day, **dict.fromkeys(COUNT_COLUMNS, 0)),
+        )
+        _add_review_counts(day_row, review)
+
+        deck_row = decks.setdefault(
+            review.deck_id,
+            dict(
+                deck_id=review.deck_id,
+                user_id=review.user_id,
+                last_studied=review.reviewed_at,
+                recent_feedback=[],
+                **dict.fromkeys(COUNT_COLUMNS, 0),
+            ),
+        )
+        _add_review_counts(deck_row, review)
+        if len(deck_row["recent_feedback"]) < RECENT_REVIEWS_WINDOW:
+            deck_row["recent_feedback"].append(review.feedback)
+
+    day_stmt = insert(UserDayStatistics).values(list(days.values()))
+    day_stmt = day_stmt.on_conflict_do_update(
+        index_elements=[UserDayStatistics.user_id, UserDayStatistics.day],
+        set_={
+            column: getattr(UserDayStatistics, column) + day_stmt.excluded[column]
+            for column in COUNT_COLUMNS
+        },
+    )
+    db_session.execute(day_stmt)
+
+    deck_stmt = insert(DeckReviewStatistics).values(list(decks.values()))
+    recent_feedback = (
+        deck_stmt.excluded.recent_feedback + DeckReviewStatistics.recent_feedback
+    )
+    deck_stmt = deck_stmt.on_conflict_do_update(
+        index_elements=[DeckReviewStatistics.deck_id],
+        set_={
+            **{
+                column: getattr(DeckReviewStatistics, column)
+                + deck_stmt.excluded[column]
+                for column in COUNT_COLUMNS
+            },
+            "last_studied": func.greatest(
+                DeckReviewStatistics.last_studied, deck_stmt.excluded.last_studied
+            ),
+            "recent_feedback": recent_feedback[1:RECENT_REVIEWS_WINDOW],
+        },
+    )
+    db_session.execute(deck_stmt)
+
+
+def review_counts_columns(succeeded, failed, mature):
+    return [
+        func.count().label("total"),
+        func.count().filter(succeeded).label("succeeded"),
+        func.count().filter(failed).label("failed"),
+        func.count().filter(mature).label("mature"),
+        func.count().filter(and_(mature, succeeded)).label("mature_succeeded"),
+    ]
+
+
+def day_statistics_from_reviews(user_id: Optional[UUID] = None):
+    review_day = cast(func.timezone("UTC", Review.reviewed_at), Date)
+    query = select(
+        Review.user_id,
+        review_day.label("day"),
+        *review_counts_columns(SUCCEEDED, FAILED, MATURE),
+    ).group_by(Review.user_id, review_day)
+    if user_id:
+        query = query.where(Review.user_id == user_id)
+    return query
+
+
+def deck_statistics_from_reviews(user_id: Optional[UUID] = None):
+    recent_feedback = array_agg(
+        aggregate_order_by(Review.feedback, Review.reviewed_at.desc())
+    )
+    query = (
+        select(
+            Review.deck_id,
+            Review.user_id,
+            *review_counts_columns(SUCCEEDED, FAILED, MATURE),
+            func.max(Review.reviewed_at).label("last_studied"),
+            recent_feedback[1:RECENT_REVIEWS_WINDOW].label("recent_feedback"),
+        )
+        # Reviews of deleted decks only count towards the user statistics
+        .join(Deck, Deck.id == Review.deck_id)
+        .group_by(Review.deck_id, Review.user_id)
+    )
+    if user_id:
+        query = query.where(Review.user_id == user_id)
+    return query
+
+
+ROLLUPS = [
+    (UserDayStatistics, DAY_STATISTICS_COLUMNS, day_statistics_from_reviews),
+    (DeckReviewStatistics, DECK_STATISTICS_COLUMNS, deck_statistics_from_reviews),
+]
+
+
+def rebuild_statistics(db_session: Session, user_id: Optional[UUID] = None):
+    """Recompute the rollups from the reviews table, for one user or everyone"""
+    try:
+        for model, columns, from_reviews in ROLLUPS:
+            stmt = delete(model)
+            if user_id:
+                stmt = stmt.where(model.user_id == user_id)
+            db_session.execute(stmt)
+            db_session.execute(
+                insert(model).from_select(columns, from_reviews(user_id))
+            )
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+
+def find_statistics_drift(
+    db_session: Session, user_id: Optional[UUID] = None
+) -> StatisticsDrift:
+    """Count rollup rows that disagree with a recomputation from the reviews"""
+    drift = []
+    for model, columns, from_reviews in ROLLUPS:
+        source = from_reviews(user_id)
+        stored = select(*[getattr(model, column) for column in columns])
+        if user_id:
+            stored = stored.where(model.user_id == user_id)
+
+        drift.append(
+            sum(
+                db_session.scalar(
+                    select(func.count()).select_from(mismatched.subquery())
+                )
+                for mismatched in [stored.except_(source), source.except_(stored)]
+            )
+        )
+
+    day_rows, deck_rows = drift
+    return StatisticsDrift(day_rows=day_rows, deck_rows=deck_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the statistics rollups against the reviews table"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the rollups from scratch"
+    )
+    args = parser.parse_args()
+
+    with next(get_db()) as db_session:
+        if args.rebuild:
+            rebuild_statistics(db_session)
+            logging.info("Rebuilt statistics rollups")
+
+        drift = find_statistics_drift(db_session)
+        if drift.drifted:
+            logging.error(
+                f"Statistics rollups drifted: {drift.day_rows} day rows, "
+                f"{drift.deck_rows} deck rows"
+            )
+            sys.exit(1)
+        logging.info("Statistics rollups are consistent")
+
+
+if __name__ == "__main__":
+    set_up_logger()
+    main()
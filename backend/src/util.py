@@ -1,9 +1,11 @@
+from typing import Dict, Iterable
 from uuid import UUID
 
 from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, contains_eager
 
-from src.auth.jwt import decode_jwt
+from src.auth.jwt import decode_jwt, guest_user_from_claims
 from src.db.models import Card, Category, Deck, User, UserRole
 
 
@@ -34,6 +36,20 @@ def get_user_card(card_id: UUID, user_id: UUID, db_session: Session) -> Card:
     return card
 
 
+def get_user_cards(
+    card_ids: Iterable[UUID], user_id: UUID, db_session: Session
+) -> Dict[UUID, Card]:
+    """Cards owned by the user among card_ids, missing ids are left out"""
+    cards = (
+        db_session.query(Card)
+        .join(Deck)
+        .filter(Card.id.in_(card_ids), Deck.user_id == user_id)
+        .options(contains_eager(Card.deck))
+        .all()
+    )
+    return {card.id: card for card in cards}
+
+
 def get_user_category(
     category_id: UUID, user_id: UUID, db_session: Session
 ) -> Category:
@@ -52,45 +68,25 @@ def get_user_from_token(request: Request, db_session: Session) -> User | None:
         user_id = payload.get("sub")
         if not user_id:
             return None
-        user = User.get(db_session, user_id)
-        return user
+        # Guests that haven't written anything yet have no users row
+        return User.get(db_session, user_id) or guest_user_from_claims(payload)
     except Exception:
         return None
 
 
-def would_create_cycle(category_id: UUID, new_parent_category: Category) -> bool:
-    current = new_parent_category
-    while current:
-        if current.id == category_id:
-            return True
-        current = current.parent
-    return False
-
-
-def calculate_depth(category: Category):
-    parent_depth = get_depth_to_root(category)
-    category_subtree_depth = get_depth_below(category)
-    return parent_depth + category_subtree_depth
-
-
-def get_depth_to_root(category: Category) -> int:
-    depth = 0
-    current = category
-    while current.parent_id:
-        current = current.parent
-        depth += 1
-    return depth
-
-
-def get_depth_below(category: Category) -> int:
-    depth = 0
-
-    def traverse(category: Category, current_depth: int):
-        nonlocal depth
-        depth = max(depth, current_depth)
-
-        for child in category.children:
-            traverse(child, current_depth + 1)
-
-    traverse(category, 0)
-    return depth
+async def get_user_from_token_async(
+    request: Request, db_session: AsyncSession
+) -> User | None:
+    """get_user_from_token for an AsyncSession"""
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        payload = decode_jwt(token)
+        user_id = payload.get("sub")
+        if not user_id:
+            return None
+        user = await User.get_async(db_session, UUID(user_id))
+        return user or guest_user_from_claims(payload)
+    except Exception:
+        return None
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime, timezone
 
+from sqlalchemy import event
+
 
 class is_uuid_string:
     def __eq__(self, value):
@@ -22,3 +24,24 @@ class is_utc_isoformat_string:
             )
         except Exception:
             return False
+
+
+class count_statements:
+    """Collects the statements an engine executes inside a with block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _collect(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._collect)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._collect)
+
+    def __len__(self):
+        return len(self.statements)
@@ -5,9 +5,11 @@ import bcrypt
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from src.db import get_db
+from src.db import get_async_database_url, get_async_db, get_db
 from src.db.models import Base, User, UserRole
 from src.main import app
 
@@ -35,14 +37,30 @@ def db_session():
 
 
 @pytest.fixture
-def client_factory(db_session):
+async def async_session_factory(db_session):
+    # Asyncpg connections belong to the event loop that opened them, so every
+    # test gets its own engine, without a pool outliving the test
+    async_engine = create_async_engine(
+        get_async_database_url(database_url), poolclass=NullPool
+    )
+    yield async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def client_factory(db_session, async_session_factory):
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
+    async def override_get_async_db():
+        async with async_session_factory() as async_db_session:
+            yield async_db_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     async def _make_client():
         ac = AsyncClient(transport=ASGITransport(app=app), base_url="http://test.local")
@@ -1,6 +1,10 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
 from sqlalchemy.orm import Session
 
 from src.db.models import AuthProviders, User, UserRole
+from src.pagination import CURSOR_NEXT, encode_cursor
 from tests.asserts import is_utc_isoformat_string, is_uuid_string
 
 
@@ -188,6 +192,98 @@ async def test_admin_get_users_pagination(db_session, admin, admin_client):
     }
 
 
+async def test_admin_get_users_cursor_pagination(db_session, admin, admin_client):
+    create_user("test1@domain.com", UserRole.USER, db_session)
+    create_user("test2@domain.com", UserRole.USER, db_session)
+    create_user("test3@domain.com", UserRole.USER, db_session)
+    expected_emails = [
+        "test3@domain.com",
+        "test2@domain.com",
+        "test1@domain.com",
+        admin.email,
+    ]
+
+    res = await admin_client.get("/admin/users", params={"mode": "cursor", "size": 3})
+    assert res.status_code == 200
+    first_page = res.json()
+    assert [user["email"] for user in first_page["items"]] == expected_emails[:3]
+    assert first_page["size"] == 3
+    assert first_page["total"] is None
+    assert first_page["has_next"]
+    assert not first_page["has_prev"]
+    assert first_page["prev_cursor"] is None
+
+    res = await admin_client.get(
+        "/admin/users",
+        params={"cursor": first_page["next_cursor"], "size": 3},
+    )
+    assert res.status_code == 200
+    last_page = res.json()
+    assert [user["email"] for user in last_page["items"]] == expected_emails[3:]
+    assert not last_page["has_next"]
+    assert last_page["next_cursor"] is None
+    assert last_page["has_prev"]
+
+    res = await admin_client.get(
+        "/admin/users",
+        params={"cursor": last_page["prev_cursor"], "size": 3},
+    )
+    assert res.status_code == 200
+    assert res.json() == first_page
+
+
+async def test_admin_get_users_cursor_pagination_walk(db_session, admin, admin_client):
+    for i in range(5):
+        create_user(f"test{i}@domain.com", UserRole.USER, db_session)
+    create_user("guest@domain.com", UserRole.GUEST, db_session)
+
+    res = await admin_client.get("/admin/users", params={"size": 100})
+    expected_ids = [user["id"] for user in res.json()["items"]]
+
+    ids = []
+    params = {"mode": "cursor", "size": 2, "include_total": True}
+    while True:
+        res = await admin_client.get("/admin/users", params=params)
+        assert res.status_code == 200
+        page = res.json()
+        assert page["total"] == 6
+        ids.extend(user["id"] for user in page["items"])
+        if not page["has_next"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert ids == expected_ids
+
+    ids = []
+    while True:
+        ids = [user["id"] for user in page["items"]] + ids
+        if not page["has_prev"]:
+            break
+        params["cursor"] = page["prev_cursor"]
+        res = await admin_client.get("/admin/users", params=params)
+        page = res.json()
+    assert ids == expected_ids
+
+
+async def test_admin_get_users_invalid_cursor_returns_400(admin, admin_client):
+    res = await admin_client.get("/admin/users", params={"cursor": "not a cursor"})
+    assert res.status_code == 400
+    assert res.json() == {"detail": "Invalid cursor"}
+
+
+async def test_admin_get_users_cursor_of_wrong_types_returns_400(admin, admin_client):
+    created_at = datetime.now(timezone.utc).isoformat()
+    for values in [
+        [created_at, 5],
+        [created_at, {"a": 1}],
+        [created_at, None],
+        [5, str(uuid4())],
+    ]:
+        cursor = encode_cursor(CURSOR_NEXT, values)
+        res = await admin_client.get("/admin/users", params={"cursor": cursor})
+        assert res.status_code == 400
+        assert res.json() == {"detail": "Invalid cursor"}
+
+
 async def test_admin_get_users_as_non_admin_returns_403(
     db_session, client, user_client
 ):
@@ -196,3 +292,33 @@ async def test_admin_get_users_as_non_admin_returns_403(
 
     res = await client.get("/admin/users")
     assert res.status_code == 403
+
+
+async def test_admin_get_db_pool_stats(admin, admin_client):
+    res = await admin_client.get("/admin/db/pool")
+    assert res.status_code == 200
+    assert set(res.json()) == {"sync", "async"}
+    for stats in res.json().values():
+        assert stats["size"] == 5
+        assert stats["checkouts"] >= 0
+
+
+async def test_admin_get_db_pool_stats_as_non_admin_returns_403(user_client):
+    res = await user_client.get("/admin/db/pool")
+    assert res.status_code == 403
+
+
+async def test_admin_get_token_cache_stats(admin, admin_client):
+    await admin_client.get("/admin/auth/token-cache")
+    res = await admin_client.get("/admin/auth/token-cache")
+    assert res.status_code == 200
+    stats = res.json()
+    # The second request's token was verified by the first one
+    assert stats["hits"] >= 1
+    assert 0 < stats["hit_rate"] <= 1
+    assert stats["size"] >= 1
+
+
+async def test_admin_get_token_cache_stats_as_non_admin_returns_403(user_client):
+    res = await user_client.get("/admin/auth/token-cache")
+    assert res.status_code == 403
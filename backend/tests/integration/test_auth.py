@@ -1,8 +1,17 @@
+import asyncio
+import threading
+
 from freezegun import freeze_time
+from sqlalchemy import event
 
+from src.api import auth
+from src.auth import passwords
 from src.auth.jwt import decode_jwt
+from src.auth.passwords import PasswordHasher
+from src.auth.token_cache import token_cache
 from src.db.models import AuthProviders, User, UserRole
 from tests.asserts import is_utc_isoformat_string, is_uuid_string
+from tests.conftest import engine
 
 
 async def test_register_user(db_session, client):
@@ -46,6 +55,24 @@ async def test_cant_register_user_with_existing_email(db_session, client):
     assert "Email is in use" in res.text
 
 
+async def test_register_user_email_taken_concurrently(monkeypatch, db_session, client):
+    hash_password_async = auth.hash_password_async
+
+    async def register_concurrently(password):
+        # Another registration takes the email after it was checked
+        User(email="user@domain.com", role=UserRole.USER).save(db_session)
+        return await hash_password_async(password)
+
+    monkeypatch.setattr(auth, "hash_password_async", register_concurrently)
+
+    res = await client.post(
+        "/auth/register", json={"email": "user@domain.com", "password": "123"}
+    )
+    assert res.status_code == 400
+    assert "Email is in use" in res.text
+    assert User.filter_by(db_session, email="user@domain.com").count() == 1
+
+
 async def test_register_and_login_user(client):
     res = await client.post(
         "/auth/register", json={"email": "user@domain.com", "password": "123"}
@@ -229,3 +256,188 @@ async def test_login_user_email_is_case_insensitive(db_session, client):
         "/auth/login", json={"email": "user@domain.com", "password": "123"}
     )
     assert res.status_code == 204
+
+
+async def test_current_principal_is_cached(db_session, admin_client):
+    # Otherwise the admin is loaded from the session without a query anyway
+    db_session.expunge_all()
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        res = await admin_client.get("/admin/db/pool")
+        assert res.status_code == 200
+        assert len(statements) == 1
+
+        res = await admin_client.get("/admin/db/pool")
+        assert res.status_code == 200
+        assert len(statements) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
+async def test_verified_token_is_cached(user_client):
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+    hits = token_cache.metrics.hits
+
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+    assert token_cache.metrics.hits == hits + 1
+
+
+async def test_tampered_token_is_rejected_after_caching(user_client):
+    access_token = user_client.cookies.get("access_token")
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+
+    header, payload, signature = access_token.split(".")
+    tampered = f"{header}.{payload}.{signature[:-4]}AAAA"
+    user_client.cookies.clear()
+    user_client.cookies.set("access_token", tampered)
+    res = await user_client.get("/decks")
+    assert res.status_code == 401
+
+
+async def test_current_principal_cache_is_invalidated_on_role_change(
+    db_session, user, user_client
+):
+    res = await user_client.get("/admin/db/pool")
+    assert res.status_code == 403
+
+    user.role = UserRole.ADMIN
+    db_session.commit()
+
+    res = await user_client.get("/admin/db/pool")
+    assert res.status_code == 200
+
+
+async def test_current_principal_cache_is_invalidated_on_promotion(client):
+    res = await client.get("/decks")
+    assert res.status_code == 200
+    res = await client.get("/decks/00000000-0000-0000-0000-000000000000/export")
+    assert res.status_code == 403
+
+    res = await client.post(
+        "/auth/register",
+        json={"email": "guest_promote@domain.com", "password": "password"},
+    )
+    assert res.status_code == 201
+
+    res = await client.get("/decks/00000000-0000-0000-0000-000000000000/export")
+    assert res.status_code == 404
+
+
+async def test_guest_reads_dont_insert_users(db_session, client_factory):
+    for path in [
+        "/me",
+        "/decks",
+        "/cards",
+        "/categories/tree",
+        "/study/queue",
+        "/stats",
+    ]:
+        client = await client_factory()
+        res = await client.get(path)
+        assert res.status_code == 200
+        assert "access_token" in res.cookies
+        await client.aclose()
+
+    assert User.all(db_session) == []
+
+
+async def test_guest_user_is_stored_on_first_write(db_session, client):
+    res = await client.get("/me")
+    guest_id = res.json()["id"]
+    assert User.all(db_session) == []
+
+    res = await client.post("/decks", json={"name": "Deck 1"})
+    assert res.status_code == 201
+    res = await client.post("/categories", json={"name": "Category"})
+    assert res.status_code == 201
+
+    users = User.all(db_session)
+    assert [str(user.id) for user in users] == [guest_id]
+    assert users[0].role == UserRole.GUEST
+
+    res = await client.get("/decks")
+    assert [deck["name"] for deck in res.json()] == ["Deck 1"]
+
+
+async def test_guest_user_refresh_without_users_row(client):
+    res = await client.get("/me")
+    guest = res.json()
+
+    res = await client.post("/auth/refresh")
+    assert res.status_code == 204
+    assert "access_token" in res.cookies
+
+    res = await client.get("/me")
+    assert res.json() == guest
+
+
+async def test_stored_guest_user_promotion_keeps_decks(client):
+    res = await client.post("/decks", json={"name": "Deck 1"})
+    assert res.status_code == 201
+
+    res = await client.post(
+        "/auth/register",
+        json={"email": "guest_promote@domain.com", "password": "password"},
+    )
+    assert res.status_code == 201
+    assert not res.json()["is_guest"]
+
+    res = await client.get("/decks")
+    assert [deck["name"] for deck in res.json()] == ["Deck 1"]
+
+
+async def test_login_rehashes_password_with_new_cost(
+    monkeypatch, db_session, user, client
+):
+    assert user.password_hash.startswith("$2b$12$")
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+
+    res = await client.post(
+        "/auth/login", json={"email": "user@domain.com", "password": "password"}
+    )
+    assert res.status_code == 204
+
+    db_session.refresh(user)
+    assert user.password_hash.startswith("$2b$04$")
+
+    res = await client.post(
+        "/auth/login", json={"email": "user@domain.com", "password": "password"}
+    )
+    assert res.status_code == 204
+
+
+async def test_login_returns_503_when_password_hashing_is_saturated(
+    monkeypatch, user, client
+):
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    monkeypatch.setattr(passwords, "password_hasher", hasher)
+    release = threading.Event()
+    busy = asyncio.ensure_future(hasher.run(release.wait))
+
+    try:
+        res = await client.post(
+            "/auth/login", json={"email": "user@domain.com", "password": "password"}
+        )
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "1"
+
+        res = await client.post(
+            "/auth/register", json={"email": "new@domain.com", "password": "password"}
+        )
+        assert res.status_code == 503
+    finally:
+        release.set()
+        await busy
+
+    res = await client.post(
+        "/auth/login", json={"email": "user@domain.com", "password": "password"}
+    )
+    assert res.status_code == 204
@@ -1,9 +1,11 @@
+import json
 import uuid
 from datetime import datetime, timedelta, timezone
 
 from freezegun import freeze_time
 
 from src.db.models import Card
+from src.pagination import CURSOR_NEXT, encode_cursor
 from tests.asserts import is_utc_isoformat_string, is_uuid_string
 
 
@@ -341,6 +343,90 @@ async def test_get_overdue_cards(ignore_jwt_expiration, db_session, user, user_c
         ]
 
 
+async def test_get_cards_cursor_pagination(db_session, user, user_client):
+    res = await user_client.post("/decks", json={"name": "deck"})
+    deck_id = res.json()["id"]
+
+    now = datetime.now(timezone.utc)
+    for i in range(7):
+        res = await user_client.post(
+            "/cards", json={"deck_id": deck_id, "content": f"Test card {i + 1}"}
+        )
+        card = Card.get(db_session, res.json()["id"])
+        card.next_review_date = now + timedelta(days=(i * 3) % 7)
+        card.save(db_session)
+
+    res = await user_client.get("/cards")
+    assert [card["content"] for card in res.json()] == [
+        f"Test card {i}" for i in range(7, 0, -1)
+    ]
+
+    for order_by in ["created_at", "next_review_date"]:
+        res = await user_client.get("/cards", params={"order_by": order_by})
+        expected = [card["id"] for card in res.json()]
+
+        ids = []
+        params = {"order_by": order_by, "mode": "cursor", "size": 3}
+        while True:
+            res = await user_client.get("/cards", params=params)
+            assert res.status_code == 200
+            page = res.json()
+            assert len(page["items"]) <= 3
+            ids.extend(card["id"] for card in page["items"])
+            if not page["has_next"]:
+                break
+            params["cursor"] = page["next_cursor"]
+        assert ids == expected
+
+    res = await user_client.get(
+        "/cards", params={"order_by": "next_review_date", "page": 2, "size": 3}
+    )
+    assert res.status_code == 200
+    page = res.json()
+    assert page["total"] == 7
+    assert [card["id"] for card in page["items"]] == expected[3:6]
+
+
+async def test_get_cards_invalid_cursor_returns_400(user, user_client):
+    res = await user_client.get("/cards", params={"cursor": "not a cursor"})
+    assert res.status_code == 400
+
+
+async def test_get_cards_cursor_of_wrong_types_returns_400(user, user_client):
+    created_at = datetime.now(timezone.utc).isoformat()
+    for values in [
+        [created_at, 5],
+        [created_at, {"a": 1}],
+        [created_at, None],
+        [5, str(uuid.uuid4())],
+    ]:
+        cursor = encode_cursor(CURSOR_NEXT, values)
+        res = await user_client.get("/cards", params={"cursor": cursor})
+        assert res.status_code == 400
+        assert res.json() == {"detail": "Invalid cursor"}
+
+
+async def test_get_cards_stream(user, user_client):
+    res = await user_client.post("/decks", json={"name": "deck"})
+    deck_id = res.json()["id"]
+    for i in range(5):
+        await user_client.post(
+            "/cards", json={"deck_id": deck_id, "content": f"Test card {i + 1}"}
+        )
+
+    res = await user_client.get("/cards")
+    cards = res.json()
+
+    res = await user_client.get("/cards", params={"stream": True})
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in res.text.splitlines()] == cards
+
+    # The request's session is usable again after the stream
+    res = await user_client.get("/cards", params={"stream": True, "deck_id": deck_id})
+    assert len(res.text.splitlines()) == 5
+
+
 async def test_update_card(user, user_client):
     res = await user_client.post(
         "/decks",
@@ -1,9 +1,13 @@
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from httpx import AsyncClient
+from sqlalchemy import func, insert, select
 
-from src.db.models import Category, Deck
-from tests.asserts import is_utc_isoformat_string, is_uuid_string
+from src.categories.closure import find_closure_drift, rebuild_closure
+from src.db.models import Card, Category, Deck
+from tests.asserts import count_statements, is_utc_isoformat_string, is_uuid_string
+from tests.conftest import engine
 
 
 async def create_category(
@@ -497,3 +501,160 @@ async def test_get_category_tree_shallow(user_client):
         "total_decks": 0,
         "tree_depth": 1,
     }
+
+
+async def test_get_category_tree_query_count_is_constant(db_session, user, user_client):
+    # 20 roots with 9 children each, with 10 children each
+    categories = []
+    for root in range(20):
+        root_id = uuid4()
+        categories.append(dict(id=root_id, name=f"root {root:02}", parent_id=None))
+        for child in range(9):
+            child_id = uuid4()
+            categories.append(
+                dict(id=child_id, name=f"child {child}", parent_id=root_id)
+            )
+            categories.extend(
+                dict(id=uuid4(), name=f"leaf {leaf}", parent_id=child_id)
+                for leaf in range(10)
+            )
+    assert len(categories) == 2000
+    db_session.execute(
+        insert(Category), [dict(user_id=user.id, **row) for row in categories]
+    )
+    db_session.execute(
+        insert(Deck),
+        [
+            dict(user_id=user.id, name=f"deck {i}", category_id=row["id"])
+            for i, row in enumerate(categories[::4])
+        ],
+    )
+    db_session.commit()
+
+    # Caches the principal
+    res = await user_client.get("/categories/tree")
+    assert res.status_code == 200
+    # Otherwise lazy loads are answered from the session without a query
+    db_session.expunge_all()
+
+    with count_statements(engine) as statements:
+        res = await user_client.get("/categories/tree")
+    assert res.status_code == 200
+    # The categories and the decks
+    assert len(statements) == 2
+
+    with count_statements(engine) as statements:
+        res = await user_client.get("/categories/tree", params={"include_counts": True})
+    assert res.status_code == 200
+    # And the card counts of every deck
+    assert len(statements) == 3
+
+    tree = res.json()
+    assert tree["total_categories"] == 2000
+    assert tree["total_decks"] == 500
+    assert tree["tree_depth"] == 3
+    assert [node["name"] for node in tree["categories"]] == [
+        f"root {root:02}" for root in range(20)
+    ]
+    leaf = tree["categories"][0]["children"][0]["children"][0]
+    assert leaf["depth"] == 3
+
+
+async def test_delete_category_statement_count_is_constant(
+    db_session, user, user_client
+):
+    parent_id, category_id = uuid4(), uuid4()
+    db_session.execute(
+        insert(Category),
+        [
+            dict(id=parent_id, user_id=user.id, name="parent"),
+            dict(id=category_id, user_id=user.id, name="category", parent_id=parent_id),
+        ]
+        + [
+            dict(user_id=user.id, name=f"child {i}", parent_id=category_id)
+            for i in range(50)
+        ],
+    )
+    db_session.execute(
+        insert(Deck),
+        [
+            dict(user_id=user.id, name=f"deck {i}", category_id=category_id)
+            for i in range(300)
+        ],
+    )
+    db_session.commit()
+    rebuild_closure(db_session, user.id)
+
+    # Caches the principal
+    res = await user_client.get("/categories/tree")
+    assert res.status_code == 200
+    db_session.expunge_all()
+
+    with count_statements(engine) as statements:
+        res = await user_client.delete(f"/categories/{category_id}")
+    assert res.status_code == 200
+    # The lookup, moving the children and the decks, two for the closure
+    # table, and the delete
+    assert len(statements) == 6
+
+    assert (
+        db_session.scalar(select(func.count()).where(Category.parent_id == parent_id))
+        == 50
+    )
+    assert (
+        db_session.scalar(select(func.count()).where(Deck.category_id == parent_id))
+        == 300
+    )
+    assert not find_closure_drift(db_session).drifted
+
+
+async def test_get_category_tree_with_counts(db_session, user_client):
+    ids = {}
+    for name, parent in [("parent", None), ("child", "parent"), ("other", None)]:
+        res = await create_category(user_client, name=name, parent_id=ids.get(parent))
+        ids[name] = res.json()["id"]
+
+    deck_ids = {}
+    for name, category in [
+        ("parent deck", "parent"),
+        ("child deck", "child"),
+        ("uncategorized", None),
+    ]:
+        res = await user_client.post(
+            "/decks", json={"name": name, "category_id": ids.get(category)}
+        )
+        deck_ids[name] = res.json()["id"]
+
+    later = datetime.now(timezone.utc) + timedelta(days=1)
+    for deck, due, not_due in [
+        ("parent deck", 1, 2),
+        ("child deck", 3, 4),
+        ("uncategorized", 5, 0),
+    ]:
+        db_session.add_all(
+            [Card(deck_id=deck_ids[deck], content="due") for _ in range(due)]
+            + [
+                Card(deck_id=deck_ids[deck], content="later", next_review_date=later)
+                for _ in range(not_due)
+            ]
+        )
+    db_session.commit()
+
+    res = await user_client.get("/categories/tree", params={"include_counts": True})
+    assert res.status_code == 200
+    tree = res.json()
+
+    parent, other = tree["categories"][1], tree["categories"][0]
+    assert parent["name"] == "parent"
+    assert (parent["card_count"], parent["due_count"]) == (10, 4)
+    assert parent["decks"][0]["card_count"] == 3
+    assert parent["decks"][0]["due_count"] == 1
+    child = parent["children"][0]
+    assert (child["card_count"], child["due_count"]) == (7, 3)
+    assert (other["card_count"], other["due_count"]) == (0, 0)
+    uncategorized = tree["uncategorized_decks"][0]
+    assert (uncategorized["card_count"], uncategorized["due_count"]) == (5, 5)
+
+    # The counts are left out unless they're asked for
+    res = await user_client.get("/categories/tree")
+    assert "card_count" not in res.json()["categories"][0]
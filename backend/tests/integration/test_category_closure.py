@@ -0,0 +1,107 @@
+from sqlalchemy import delete, select
+
+from src.categories.closure import find_closure_drift, rebuild_closure
+from src.db.models import CategoryClosure
+
+
+async def create_categories(client, tree: dict, parent_id: str = None) -> dict:
+    """Create nested categories from {name: {child name: ...}}, by name"""
+    ids = {}
+    for name, children in tree.items():
+        res = await client.post(
+            "/categories", json={"name": name, "parent_id": parent_id}
+        )
+        assert res.status_code == 201
+        ids[name] = res.json()["id"]
+        ids.update(await create_categories(client, children, ids[name]))
+    return ids
+
+
+def closure_depths(db_session) -> set:
+    return {
+        (str(row.ancestor_id), str(row.descendant_id), row.depth)
+        for row in db_session.scalars(select(CategoryClosure))
+    }
+
+
+async def test_closure_follows_created_categories(db_session, user_client):
+    ids = await create_categories(user_client, {"a": {"b": {"c": {}}}, "d": {}})
+
+    assert closure_depths(db_session) == {
+        (ids["a"], ids["a"], 0),
+        (ids["b"], ids["b"], 0),
+        (ids["c"], ids["c"], 0),
+        (ids["d"], ids["d"], 0),
+        (ids["a"], ids["b"], 1),
+        (ids["b"], ids["c"], 1),
+        (ids["a"], ids["c"], 2),
+    }
+    assert not find_closure_drift(db_session).drifted
+
+
+async def test_closure_follows_moved_categories(db_session, user_client):
+    ids = await create_categories(user_client, {"a": {"b": {"c": {}}}, "d": {}})
+
+    res = await user_client.patch(
+        f"/categories/{ids['b']}", json={"parent_id": ids["d"]}
+    )
+    assert res.status_code == 200
+    assert (ids["d"], ids["c"], 2) in closure_depths(db_session)
+    assert (ids["a"], ids["c"], 2) not in closure_depths(db_session)
+    assert not find_closure_drift(db_session).drifted
+
+    # Back to the root
+    res = await user_client.patch(f"/categories/{ids['b']}", json={"parent_id": None})
+    assert res.status_code == 200
+    assert not find_closure_drift(db_session).drifted
+
+    # Renaming doesn't touch the closure
+    res = await user_client.patch(f"/categories/{ids['c']}", json={"name": "e"})
+    assert res.status_code == 200
+    assert not find_closure_drift(db_session).drifted
+
+
+async def test_closure_follows_deleted_categories(db_session, user_client):
+    ids = await create_categories(user_client, {"a": {"b": {"c": {"d": {}}}}})
+
+    res = await user_client.delete(f"/categories/{ids['b']}")
+    assert res.status_code == 200
+    assert (ids["a"], ids["d"], 2) in closure_depths(db_session)
+    assert not find_closure_drift(db_session).drifted
+
+
+async def test_get_decks_in_subcategories(user_client):
+    ids = await create_categories(user_client, {"a": {"b": {"c": {}}}, "d": {}})
+    for name in ["a", "c", "d"]:
+        res = await user_client.post(
+            "/decks", json={"name": f"deck {name}", "category_id": ids[name]}
+        )
+        assert res.status_code == 201
+
+    res = await user_client.get(
+        "/decks", params={"category_id": ids["a"], "include_subcategories": True}
+    )
+    assert res.status_code == 200
+    assert [deck["name"] for deck in res.json()] == ["deck a", "deck c"]
+
+    res = await user_client.get("/decks", params={"category_id": ids["a"]})
+    assert [deck["name"] for deck in res.json()] == ["deck a"]
+
+
+async def test_find_and_repair_closure_drift(db_session, user, user_client):
+    ids = await create_categories(user_client, {"a": {"b": {}}})
+    db_session.execute(
+        delete(CategoryClosure).where(CategoryClosure.descendant_id == ids["b"])
+    )
+    db_session.add(
+        CategoryClosure(ancestor_id=ids["b"], descendant_id=ids["a"], depth=1)
+    )
+    db_session.commit()
+
+    drift = find_closure_drift(db_session, user.id)
+    assert drift.drifted
+    assert drift.missing_rows == 2
+    assert drift.unexpected_rows == 1
+
+    rebuild_closure(db_session, user.id)
+    assert not find_closure_drift(db_session).drifted
@@ -0,0 +1,115 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert
+
+from src.categories import hierarchy
+from src.db.models import Category
+from tests.asserts import count_statements
+from tests.conftest import engine
+
+
+@pytest.fixture
+def categories(db_session, user):
+    """music > (rock > punk, jazz), and language"""
+    created = {}
+    for name, parent in [
+        ("music", None),
+        ("rock", "music"),
+        ("punk", "rock"),
+        ("jazz", "music"),
+        ("language", None),
+    ]:
+        category = Category(
+            user_id=user.id,
+            name=name,
+            parent_id=created[parent].id if parent else None,
+        )
+        created[name] = category.save(db_session)
+    return created
+
+
+def test_get_ancestors_and_path(db_session, categories):
+    punk = categories["punk"]
+    ancestors = hierarchy.get_ancestors(db_session, punk.id)
+
+    assert [row.name for row in ancestors] == ["music", "rock"]
+    assert hierarchy.get_path(db_session, punk.id) == ["music", "rock", "punk"]
+    assert hierarchy.get_path(db_session, categories["language"].id) == ["language"]
+
+
+def test_get_depth(db_session, categories):
+    assert hierarchy.get_depth(db_session, categories["music"].id) == 0
+    assert hierarchy.get_depth(db_session, categories["rock"].id) == 1
+    assert hierarchy.get_depth(db_session, categories["punk"].id) == 2
+
+
+def test_get_descendants(db_session, categories):
+    descendants = hierarchy.get_descendants(db_session, categories["music"].id)
+
+    assert {(row.id, row.distance) for row in descendants} == {
+        (categories["rock"].id, 1),
+        (categories["jazz"].id, 1),
+        (categories["punk"].id, 2),
+    }
+    assert hierarchy.get_descendants(db_session, categories["punk"].id) == []
+    assert hierarchy.get_subtree_height(db_session, categories["music"].id) == 2
+    assert hierarchy.get_subtree_height(db_session, categories["punk"].id) == 0
+
+
+def test_get_forest(db_session, user, categories):
+    forest = hierarchy.get_forest(db_session, user.id)
+
+    assert {
+        category_id: (row.depth, row.path) for category_id, row in forest.items()
+    } == {
+        categories["music"].id: (0, ["music"]),
+        categories["rock"].id: (1, ["music", "rock"]),
+        categories["punk"].id: (2, ["music", "rock", "punk"]),
+        categories["jazz"].id: (1, ["music", "jazz"]),
+        categories["language"].id: (0, ["language"]),
+    }
+
+
+def test_would_create_cycle(db_session, categories):
+    music, punk = categories["music"], categories["punk"]
+
+    assert hierarchy.would_create_cycle(db_session, music.id, punk.id)
+    assert hierarchy.would_create_cycle(db_session, music.id, music.id)
+    assert not hierarchy.would_create_cycle(db_session, punk.id, music.id)
+    assert not hierarchy.would_create_cycle(
+        db_session, punk.id, categories["language"].id
+    )
+
+
+async def test_category_paths_query_count_is_constant(db_session, user, user_client):
+    # A chain 50 levels deep
+    rows, parent_id = [], None
+    for level in range(50):
+        rows.append(dict(id=uuid4(), name=f"level {level:02}", parent_id=parent_id))
+        parent_id = rows[-1]["id"]
+    db_session.execute(insert(Category), [dict(user_id=user.id, **row) for row in rows])
+    db_session.commit()
+
+    # Caches the principal
+    res = await user_client.get("/categories")
+    assert res.status_code == 200
+    # Otherwise parents are loaded from the session without a query
+    db_session.expunge_all()
+
+    with count_statements(engine) as statements:
+        res = await user_client.get("/categories")
+    assert res.status_code == 200
+    assert len(statements) == 1
+
+    categories = res.json()
+    assert len(categories) == 50
+    assert categories[-1]["path"] == [f"level {level:02}" for level in range(50)]
+
+    db_session.expunge_all()
+    with count_statements(engine) as statements:
+        res = await user_client.get(f"/categories/{parent_id}")
+    assert res.status_code == 200
+    # The category and its path
+    assert len(statements) == 2
+    assert res.json()["path"] == categories[-1]["path"]
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.db import get_async_database_url
+from src.db.pool import PoolSettings
+from tests.conftest import database_url
+
+
+def test_pool_metrics():
+    engine = create_engine(
+        database_url,
+        **PoolSettings(size=1, max_overflow=1, timeout=0.1).engine_kwargs(),
+    )
+    try:
+        with engine.connect() as conn_1, engine.connect() as conn_2:
+            stats = engine.pool.stats()
+            assert stats["checked_out"] == 2
+            assert stats["overflow"] == 1
+            assert stats["checkouts"] == 2
+            assert stats["overflow_connections"] == 1
+
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            conn_1.execute(text("SELECT 1"))
+            conn_2.execute(text("SELECT 1"))
+
+            # Taking the pooled connection again, while still over the pool
+            # size, doesn't open a connection
+            conn_1.close()
+            with engine.connect():
+                stats = engine.pool.stats()
+                assert stats["overflow"] == 1
+                assert stats["checkouts"] == 3
+                assert stats["overflow_connections"] == 1
+
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["timeouts"] == 1
+        assert stats["max_wait_seconds"] > 0
+        assert stats["mean_wait_seconds"] <= stats["max_wait_seconds"]
+    finally:
+        engine.dispose()
+
+
+def test_pool_metrics_concurrent_overflow_connections():
+    engine = create_engine(
+        database_url,
+        **PoolSettings(size=1, max_overflow=4, timeout=5).engine_kwargs(),
+    )
+    barrier = threading.Barrier(5)
+
+    def check_out():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            # Hold every connection until all of them are checked out
+            barrier.wait(timeout=5)
+
+    try:
+        threads = [threading.Thread(target=check_out) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = engine.pool.stats()
+        assert stats["checkouts"] == 5
+        assert stats["overflow_connections"] == 4
+    finally:
+        engine.dispose()
+
+
+async def test_async_pool_pgbouncer_mode():
+    async_engine = create_async_engine(
+        get_async_database_url(database_url),
+        **PoolSettings(pgbouncer=True).engine_kwargs(is_async=True),
+    )
+    try:
+        for _ in range(2):
+            async with async_engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT CAST(:value AS integer)"), {"value": 1}
+                )
+                assert result.scalar() == 1
+        assert async_engine.pool.stats()["checkouts"] == 2
+    finally:
+        await async_engine.dispose()
@@ -0,0 +1,87 @@
+import base64
+import json
+
+import pytest
+
+import src.db
+import src.db.routing
+from src.db.routing import LAST_WRITE_SESSION_KEY
+from tests.conftest import TestingSessionLocal
+
+
+def get_last_write(client) -> float:
+    # The session cookie is signed, but not encrypted
+    payload = client.cookies["session"].split(".")[0]
+    return json.loads(base64.b64decode(payload))[LAST_WRITE_SESSION_KEY]
+
+
+@pytest.fixture
+def replica_sessions(monkeypatch, async_session_factory):
+    """A "replica" that is just the test database again, recording
+    every session opened on it"""
+    sessions = []
+
+    def replica_session_factory():
+        session = TestingSessionLocal()
+        sessions.append(session)
+        return session
+
+    def async_replica_session_factory():
+        session = async_session_factory()
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(src.db, "ReplicaSessionLocal", replica_session_factory)
+    monkeypatch.setattr(
+        src.db, "AsyncReplicaSessionLocal", async_replica_session_factory
+    )
+    return sessions
+
+
+async def test_reads_without_replica_use_primary(user_client):
+    assert src.db.ReplicaSessionLocal is None
+
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+    assert "session" not in res.cookies
+
+
+async def test_reads_go_to_replica(monkeypatch, replica_sessions, client_factory, user):
+    monkeypatch.setattr(src.db.routing, "REPLICA_STICKY_SECONDS", 60)
+    client = await client_factory()
+    res = await client.post(
+        "/auth/login", json={"email": "user@domain.com", "password": "password"}
+    )
+    assert res.status_code == 204
+    res = await client.post("/decks", json={"name": "Deck"})
+    assert res.status_code == 201
+    deck_id = res.json()["id"]
+
+    # Reads right after a write stick to the primary
+    res = await client.get("/decks")
+    assert res.status_code == 200
+    assert [deck["id"] for deck in res.json()] == [deck_id]
+    assert replica_sessions == []
+
+    # Once the window has passed, they go to the replica
+    monkeypatch.setattr(src.db.routing, "REPLICA_STICKY_SECONDS", 0)
+    for path in ["/decks", f"/decks/{deck_id}", "/categories/tree", "/stats"]:
+        res = await client.get(path)
+        assert res.status_code == 200
+    assert len(replica_sessions) == 4
+
+    # Failed writes don't pin the client to the primary
+    last_write = get_last_write(client)
+    res = await client.post("/cards", json={"deck_id": deck_id})
+    assert res.status_code == 422
+    assert get_last_write(client) == last_write
+
+    monkeypatch.setattr(src.db.routing, "REPLICA_STICKY_SECONDS", 60)
+    res = await client.post("/cards", json={"deck_id": deck_id, "content": "x"})
+    assert res.status_code == 201
+    res = await client.get("/cards")
+    assert res.status_code == 200
+    assert len(res.json()) == 1
+    assert len(replica_sessions) == 4
+
+    await client.aclose()
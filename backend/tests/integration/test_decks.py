@@ -1,8 +1,12 @@
 import json
 import uuid
+from datetime import datetime, timedelta, timezone
 
-from src.db.models import Card, Deck
-from tests.asserts import is_utc_isoformat_string, is_uuid_string
+from sqlalchemy import insert
+
+from src.db.models import Card, Deck, Review
+from tests.asserts import count_statements, is_utc_isoformat_string, is_uuid_string
+from tests.conftest import engine
 
 
 async def test_create_deck_returns_deck(db_session, user, user_client):
@@ -161,6 +165,42 @@ async def test_delete_deck(db_session, user_client):
     assert deck == []
 
 
+async def test_delete_deck_is_one_statement(db_session, user, user_client):
+    deck = Deck(user_id=user.id, name="deck", description="").save(db_session)
+    db_session.execute(
+        insert(Card), [dict(deck_id=deck.id, content="card") for _ in range(1000)]
+    )
+    db_session.add(
+        Review(
+            card_id=uuid.uuid4(),
+            deck_id=deck.id,
+            user_id=user.id,
+            deck_name=deck.name,
+            feedback="ok",
+            interval=1,
+            repetitions=1,
+        )
+    )
+    db_session.commit()
+    deck_id = deck.id
+
+    # Caches the principal
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+    db_session.expunge_all()
+
+    with count_statements(engine) as statements:
+        res = await user_client.delete(f"/decks/{deck_id}")
+    assert res.status_code == 200
+    assert res.json() == {"id": str(deck_id)}
+    # The cards go with it through ON DELETE CASCADE
+    assert len(statements) == 1
+
+    assert Card.filter_by(db_session, deck_id=deck_id).count() == 0
+    # Reviews are kept as history
+    assert Review.filter_by(db_session, deck_id=deck_id).count() == 1
+
+
 async def test_delete_deck_doesnt_exist_returns_404(db_session, user_client):
     res = await user_client.post(
         "/decks",
@@ -441,3 +481,73 @@ async def test_get_decks_by_category(user, user_client):
             "updated_at": is_utc_isoformat_string(),
         }
     ]
+
+
+async def test_get_decks_with_counts(db_session, user, user_client):
+    full = Deck(user_id=user.id, name="full", description="").save(db_session)
+    Deck(user_id=user.id, name="empty", description="").save(db_session)
+
+    now = datetime.now(timezone.utc)
+    reviewed_at = now - timedelta(days=2)
+    db_session.add_all(
+        [
+            # New and due
+            Card(deck_id=full.id, content="new"),
+            # Reviewed, one of them due
+            Card(deck_id=full.id, content="due", last_reviewed_at=reviewed_at),
+            Card(
+                deck_id=full.id,
+                content="later",
+                next_review_date=now + timedelta(days=1),
+                last_reviewed_at=now - timedelta(days=3),
+            ),
+        ]
+    )
+    db_session.commit()
+
+    res = await user_client.get("/decks", params={"include_counts": True})
+    assert res.status_code == 200
+    empty_deck, full_deck = res.json()
+
+    assert full_deck["name"] == "full"
+    assert full_deck["card_count"] == 3
+    assert full_deck["due_count"] == 2
+    assert full_deck["new_count"] == 1
+    assert datetime.fromisoformat(full_deck["last_reviewed_at"]) == reviewed_at
+
+    assert empty_deck["name"] == "empty"
+    assert empty_deck["card_count"] == 0
+    assert empty_deck["due_count"] == 0
+    assert empty_deck["new_count"] == 0
+    assert empty_deck["last_reviewed_at"] is None
+
+    # The counts are left out unless they're asked for
+    res = await user_client.get("/decks")
+    assert "card_count" not in res.json()[0]
+
+
+async def test_get_decks_with_counts_query_count_is_constant(
+    db_session, user, user_client
+):
+    decks = [
+        Deck(user_id=user.id, name=f"deck {i:02}", description="") for i in range(50)
+    ]
+    db_session.add_all(decks)
+    db_session.flush()
+    db_session.execute(
+        insert(Card),
+        [dict(deck_id=deck.id, content="card") for deck in decks for _ in range(20)],
+    )
+    db_session.commit()
+
+    # Caches the principal
+    res = await user_client.get("/decks")
+    assert res.status_code == 200
+    db_session.expunge_all()
+
+    with count_statements(engine) as statements:
+        res = await user_client.get("/decks", params={"include_counts": True})
+    assert res.status_code == 200
+    assert len(statements) == 1
+    assert len(res.json()) == 50
+    assert all(deck["card_count"] == 20 for deck in res.json())
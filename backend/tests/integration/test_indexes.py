@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.db.models import Card, Category, Deck, DeckReviewStatistics, Review, User
+from src.db.purge import guest_batch_query, inactive_guests_query
+
+
+def explain(db_session, query) -> str:
+    # The test tables are tiny, so make the planner prefer any usable index
+    db_session.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(db_session.bind)
+    rows = db_session.connection().exec_driver_sql(
+        f"EXPLAIN {compiled}", compiled.params
+    )
+    return "\n".join(row[0] for row in rows)
+
+
+def test_latest_review_of_card_uses_index(db_session):
+    query = (
+        Review.filter_by(db_session, card_id=uuid4())
+        .order_by(Review.reviewed_at.desc())
+        .limit(1)
+    )
+
+    plan = explain(db_session, query)
+    assert "ix_reviews_card_id_reviewed_at" in plan
+    assert "Sort" not in plan
+
+
+def test_user_reviews_by_date_uses_index(db_session):
+    query = Review.filter_by(db_session, user_id=uuid4()).filter(
+        Review.reviewed_at >= datetime(2025, 7, 1, tzinfo=timezone.utc)
+    )
+
+    plan = explain(db_session, query)
+    assert "ix_reviews_user_id_reviewed_at" in plan
+
+
+def test_due_cards_use_indexes(db_session):
+    query = (
+        db_session.query(Card)
+        .join(Deck)
+        .filter(
+            Deck.user_id == uuid4(),
+            Card.next_review_date <= datetime.now(timezone.utc),
+        )
+        .order_by(Card.next_review_date)
+    )
+
+    plan = explain(db_session, query)
+    assert "ix_cards_deck_id_next_review_date" in plan
+    assert "ix_decks_user_id_category_id" in plan
+
+
+def test_decks_in_category_use_index(db_session):
+    query = Deck.filter_by(db_session, user_id=uuid4(), category_id=uuid4())
+
+    plan = explain(db_session, query)
+    assert "ix_decks_user_id_category_id" in plan
+
+
+def test_users_keyset_pagination_uses_index(db_session):
+    created_at = datetime.now(timezone.utc)
+    query = (
+        db_session.query(User)
+        .filter(
+            (User.created_at < created_at)
+            | ((User.created_at == created_at) & (User.id > uuid4()))
+        )
+        .order_by(User.created_at.desc(), User.id)
+        .limit(20)
+    )
+
+    plan = explain(db_session, query)
+    assert "ix_users_created_at_id" in plan
+    assert "Sort" not in plan
+
+
+def test_guest_purge_batches_use_index(db_session):
+    cutoff = datetime.now(timezone.utc)
+    query = guest_batch_query(inactive_guests_query(cutoff), (cutoff, uuid4()), 500)
+
+    plan = explain(db_session, query)
+    assert "ix_users_guests_created_at_id" in plan
+    assert "Sort" not in plan
+
+
+def test_foreign_key_lookups_use_indexes(db_session):
+    # The lookups foreign key checks make when users or categories are deleted
+    for query, index in [
+        (Category.filter_by(db_session, user_id=uuid4()), "ix_categories_user_id"),
+        (Category.filter_by(db_session, parent_id=uuid4()), "ix_categories_parent_id"),
+        (Deck.filter_by(db_session, category_id=uuid4()), "ix_decks_category_id"),
+        (
+            db_session.query(DeckReviewStatistics).filter_by(user_id=uuid4()),
+            "ix_deck_review_statistics_user_id",
+        ),
+    ]:
+        assert index in explain(db_session, query)
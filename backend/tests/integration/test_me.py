@@ -1,4 +1,4 @@
-from src.db.models import AuthProviders
+from src.db.models import AuthProviders, User, UserRole
 from tests.asserts import is_utc_isoformat_string
 
 
@@ -13,3 +13,37 @@ async def test_get_me(user, user_client):
         "updated_at": is_utc_isoformat_string(),
         "is_guest": False,
     }
+
+
+async def test_get_me_returns_guest_without_storing_it(db_session, client):
+    res = await client.get("/me")
+    assert res.status_code == 200
+    assert res.json()["is_guest"]
+    assert "access_token" in res.cookies
+
+    # Guests only get a users row once they write something
+    assert User.get(db_session, res.json()["id"]) is None
+
+    # The guest's access token is used from then on
+    res_again = await client.get("/me")
+    assert res_again.json() == res.json()
+
+
+async def test_get_me_invalid_token_returns_401(client):
+    client.cookies.set("access_token", "not a token")
+    res = await client.get("/me")
+    assert res.status_code == 401
+
+
+async def test_async_model_helpers(db_session, async_session_factory):
+    async with async_session_factory() as async_db_session:
+        user = await User(email="async@domain.com", role=UserRole.USER).save_async(
+            async_db_session
+        )
+        assert user.created_at is not None
+
+        assert (await User.get_async(async_db_session, user.id)) is user
+        result = await User.filter_by_async(async_db_session, email="async@domain.com")
+        assert result.one() is user
+
+    assert User.get(db_session, user.id).email == "async@domain.com"
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from src.db.models import (
+    Card,
+    Category,
+    Deck,
+    DeckReviewStatistics,
+    Review,
+    ReviewFeedback,
+    User,
+    UserDayStatistics,
+    UserRole,
+)
+from src.db.purge import purge_guests
+from src.statistics.rollups import record_reviews
+
+LONG_AGO = datetime.now(timezone.utc) - timedelta(days=60)
+
+
+def create_user_with_data(
+    db_session, role: UserRole, created_at: datetime, active_at: datetime
+) -> User:
+    user = User(role=role, created_at=created_at).save(db_session)
+
+    parent = Category(user_id=user.id, name="Parent", updated_at=created_at)
+    parent.save(db_session)
+    Category(
+        user_id=user.id, name="Child", parent_id=parent.id, updated_at=created_at
+    ).save(db_session)
+
+    deck = Deck(
+        user_id=user.id, name="Deck", category_id=parent.id, updated_at=created_at
+    )
+    deck.save(db_session)
+    reviews = []
+    for i in range(3):
+        card = Card(deck_id=deck.id, content=f"card {i}", updated_at=created_at)
+        card.save(db_session)
+        reviews.append(
+            Review(
+                card_id=card.id,
+                deck_id=deck.id,
+                user_id=user.id,
+                reviewed_at=active_at,
+                deck_name=deck.name,
+                feedback=ReviewFeedback.OK,
+                interval=1,
+                repetitions=1,
+            )
+        )
+    db_session.add_all(reviews)
+    record_reviews(db_session, reviews)
+    db_session.commit()
+    return user
+
+
+def count_rows(db_session, user_id: UUID) -> dict:
+    deck_ids = [deck.id for deck in Deck.filter_by(db_session, user_id=user_id)]
+    return {
+        "users": User.filter_by(db_session, id=user_id).count(),
+        "reviews": Review.filter_by(db_session, user_id=user_id).count(),
+        "user_day_statistics": db_session.query(UserDayStatistics)
+        .filter_by(user_id=user_id)
+        .count(),
+        "deck_review_statistics": db_session.query(DeckReviewStatistics)
+        .filter_by(user_id=user_id)
+        .count(),
+        "cards": db_session.query(Card).filter(Card.deck_id.in_(deck_ids)).count(),
+        "decks": len(deck_ids),
+        "categories": Category.filter_by(db_session, user_id=user_id).count(),
+    }
+
+
+def test_purge_guests(db_session):
+    inactive_guests = [
+        create_user_with_data(db_session, UserRole.GUEST, LONG_AGO, LONG_AGO)
+        for _ in range(3)
+    ]
+    empty_guest = User(role=UserRole.GUEST, created_at=LONG_AGO).save(db_session)
+    recent_guest = User(role=UserRole.GUEST).save(db_session)
+    active_guest = create_user_with_data(
+        db_session, UserRole.GUEST, LONG_AGO, datetime.now(timezone.utc)
+    )
+    old_user = create_user_with_data(db_session, UserRole.USER, LONG_AGO, LONG_AGO)
+
+    purged_ids = [guest.id for guest in [*inactive_guests, empty_guest]]
+    kept = {
+        user.id: count_rows(db_session, user.id) for user in [active_guest, old_user]
+    }
+
+    result = purge_guests(
+        db_session, older_than=timedelta(days=30), batch_size=2, chunk_size=2
+    )
+    db_session.expire_all()
+
+    assert result.guests == 4
+    assert result.rows == {
+        "reviews": 9,
+        "user_day_statistics": 3,
+        "deck_review_statistics": 3,
+        "cards": 9,
+        "decks": 3,
+        "categories": 6,
+        "users": 4,
+    }
+    assert result.seconds > 0
+
+    for user_id in purged_ids:
+        assert set(count_rows(db_session, user_id).values()) == {0}
+    assert User.get(db_session, recent_guest.id)
+    for user_id, rows in kept.items():
+        assert count_rows(db_session, user_id) == rows
+
+
+def test_purge_guests_dry_run(db_session):
+    guest = create_user_with_data(db_session, UserRole.GUEST, LONG_AGO, LONG_AGO)
+    rows = count_rows(db_session, guest.id)
+
+    result = purge_guests(db_session, older_than=timedelta(days=30), dry_run=True)
+    assert result.guests == 1
+    assert result.rows == {}
+    assert count_rows(db_session, guest.id) == rows
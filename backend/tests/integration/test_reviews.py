@@ -1,9 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from freezegun import freeze_time
 
 from src.api.reviews import get_scheduler
-from src.db.models import Card, Review, ReviewFeedback
+from src.db.models import Card, DeckReviewStatistics, Review, ReviewFeedback
 from src.main import app
 from src.schedulers.basic import BasicScheduler
+from src.statistics.rollups import find_statistics_drift
 from tests.asserts import is_utc_isoformat_string, is_uuid_string
 
 
@@ -97,6 +101,10 @@ async def test_create_review(db_session, user, user_client):
     card = Card.get(db_session, card_id)
     assert card is not None
     assert card.next_review_date.date() == next_review_date
+    assert card.repetitions == 2
+    assert card.ease_factor == 2.80
+    assert card.interval == 5
+    assert card.last_reviewed_at == datetime.fromisoformat(reviewed_at)
     assert len(Review.all(db_session)) == 2
 
     app.dependency_overrides.clear()
@@ -312,3 +320,173 @@ async def test_get_review_history(user, user_client):
             "failed": True,
         },
     ]
+
+
+@freeze_time("2025-07-10")
+async def test_create_reviews_batch(
+    ignore_jwt_expiration, db_session, user, user_client
+):
+    res = await user_client.post("/decks", json={"name": "deck"})
+    deck_id = res.json()["id"]
+    res = await user_client.post(
+        "/cards", json={"deck_id": deck_id, "content": "Test card"}
+    )
+    card_1_id = res.json()["id"]
+    res = await user_client.post(
+        "/cards", json={"deck_id": deck_id, "content": "Other card"}
+    )
+    card_2_id = res.json()["id"]
+
+    res = await user_client.post(
+        "/reviews/batch",
+        json={
+            "reviews": [
+                {
+                    "card_id": card_1_id,
+                    "feedback": ReviewFeedback.OK,
+                    "reviewed_at": "2025-07-01T08:00:00Z",
+                },
+                {
+                    "card_id": card_2_id,
+                    "feedback": ReviewFeedback.FORGOT,
+                    "reviewed_at": "2025-07-01T08:01:00Z",
+                },
+                {
+                    "card_id": card_1_id,
+                    "feedback": ReviewFeedback.OK,
+                    "reviewed_at": "2025-07-02T08:00:00Z",
+                },
+            ]
+        },
+    )
+    assert res.status_code == 200
+    results = res.json()
+    assert [result["card_id"] for result in results] == [
+        card_1_id,
+        card_2_id,
+        card_1_id,
+    ]
+    assert all(result["error"] is None for result in results)
+
+    # Reviews of the same card are replayed in order
+    assert [result["review"]["repetitions"] for result in results] == [1, 0, 2]
+    assert results[2]["review"]["interval"] == 5
+    assert results[2]["review"]["ease_factor"] == 2.80
+    assert results[2]["review"]["reviewed_at"] == "2025-07-02T08:00:00Z"
+
+    card = Card.get(db_session, card_1_id)
+    assert card.repetitions == 2
+    assert card.interval == 5
+    assert card.last_reviewed_at == datetime(2025, 7, 2, 8, tzinfo=timezone.utc)
+    assert card.next_review_date == datetime(2025, 7, 7, 8, tzinfo=timezone.utc)
+    assert len(Review.all(db_session)) == 3
+
+    rollup = db_session.get(DeckReviewStatistics, deck_id)
+    assert rollup.total == 3
+    assert rollup.recent_feedback == [
+        ReviewFeedback.OK,
+        ReviewFeedback.FORGOT,
+        ReviewFeedback.OK,
+    ]
+    assert not find_statistics_drift(db_session).drifted
+
+
+@freeze_time("2025-07-10")
+async def test_create_reviews_batch_invalid_items(
+    ignore_jwt_expiration, db_session, user, admin_client, user_client
+):
+    res = await admin_client.post("/decks", json={"name": "deck"})
+    res = await admin_client.post(
+        "/cards", json={"deck_id": res.json()["id"], "content": "Test card"}
+    )
+    other_user_card_id = res.json()["id"]
+
+    res = await user_client.post("/decks", json={"name": "deck"})
+    res = await user_client.post(
+        "/cards", json={"deck_id": res.json()["id"], "content": "Test card"}
+    )
+    card_id = res.json()["id"]
+    unknown_card_id = str(uuid4())
+
+    res = await user_client.post(
+        "/reviews/batch",
+        json={
+            "reviews": [
+                {"card_id": other_user_card_id, "feedback": ReviewFeedback.OK},
+                {"card_id": unknown_card_id, "feedback": ReviewFeedback.OK},
+                {
+                    "card_id": card_id,
+                    "feedback": ReviewFeedback.OK,
+                    "reviewed_at": "2025-07-11T00:00:00Z",
+                },
+                {"card_id": card_id, "feedback": ReviewFeedback.OK},
+            ]
+        },
+    )
+    assert res.status_code == 200
+    results = res.json()
+    assert results[0] == {
+        "card_id": other_user_card_id,
+        "review": None,
+        "error": "Card not found or access denied",
+    }
+    assert results[1] == {
+        "card_id": unknown_card_id,
+        "review": None,
+        "error": "Card not found or access denied",
+    }
+    assert results[2] == {
+        "card_id": card_id,
+        "review": None,
+        "error": "Review date is in the future",
+    }
+    assert results[3]["error"] is None
+    assert results[3]["review"]["reviewed_at"] == "2025-07-10T00:00:00Z"
+    assert len(Review.all(db_session)) == 1
+
+
+@freeze_time("2025-07-10")
+async def test_create_reviews_batch_older_than_last_review(
+    ignore_jwt_expiration, db_session, user, user_client
+):
+    res = await user_client.post("/decks", json={"name": "deck"})
+    res = await user_client.post(
+        "/cards", json={"deck_id": res.json()["id"], "content": "Test card"}
+    )
+    card_id = res.json()["id"]
+
+    res = await user_client.post(
+        "/reviews", json={"card_id": card_id, "feedback": ReviewFeedback.OK}
+    )
+    assert res.status_code == 201
+
+    res = await user_client.post(
+        "/reviews/batch",
+        json={
+            "reviews": [
+                {
+                    "card_id": card_id,
+                    "feedback": ReviewFeedback.FORGOT,
+                    "reviewed_at": "2025-07-09T00:00:00Z",
+                },
+            ]
+        },
+    )
+    assert res.status_code == 200
+    assert res.json() == [
+        {
+            "card_id": card_id,
+            "review": None,
+            "error": "Review is older than the card's last review",
+        }
+    ]
+
+    card = Card.get(db_session, card_id)
+    assert card.repetitions == 1
+    assert card.last_reviewed_at == datetime(2025, 7, 10, tzinfo=timezone.utc)
+    assert len(Review.all(db_session)) == 1
+
+
+async def test_create_reviews_batch_empty(user_client):
+    res = await user_client.post("/reviews/batch", json={"reviews": []})
+    assert res.status_code == 422
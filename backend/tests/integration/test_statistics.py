@@ -1,9 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from uuid import uuid4
 
 from freezegun import freeze_time
 
-from src.db.models import ReviewFeedback
-from src.statistics import DifficultyRankings
+from src.db.models import (
+    Deck,
+    DeckReviewStatistics,
+    Review,
+    ReviewFeedback,
+    UserDayStatistics,
+)
+from src.statistics import (
+    RECENT_REVIEWS_WINDOW,
+    DifficultyRankings,
+    calculate_daily_reviews,
+    calculate_retention_rate,
+    calculate_streak,
+    calculate_success_rate,
+    get_decks_statistics,
+)
+from src.statistics.rollups import find_statistics_drift, rebuild_statistics
 
 
 @freeze_time("2025-07-01")
@@ -341,3 +357,91 @@ async def test_get_deck_statistics(ignore_jwt_expiration, user_client):
             "last_studied": None,
             "difficulty_ranking": DifficultyRankings.NEW,
         }
+
+
+@freeze_time("2025-07-10")
+async def test_get_statistics_matches_python_reference(db_session, user, user_client):
+    """The SQL aggregations should agree with the reference implementations"""
+    res = await user_client.post("/decks", json={"name": "deck 1"})
+    deck_1 = Deck.get(db_session, res.json()["id"])
+    res = await user_client.post("/decks", json={"name": "deck 2"})
+    deck_2 = Deck.get(db_session, res.json()["id"])
+
+    feedbacks = [ReviewFeedback.OK, ReviewFeedback.FORGOT, ReviewFeedback.SKIPPED]
+    days = [1, 2, 3, 5, 8, 9, 10]
+    reviews = []
+    for i in range(60):
+        deck = deck_1 if i % 3 else deck_2
+        reviews.append(
+            Review(
+                card_id=uuid4(),
+                deck_id=deck.id,
+                user_id=user.id,
+                reviewed_at=datetime(
+                    2025, 7, days[i % len(days)], 12, i, tzinfo=timezone.utc
+                ),
+                card_content="",
+                deck_name=deck.name,
+                feedback=feedbacks[i % 5 % 3],
+                interval=(i * 7) % 40,
+                repetitions=0,
+            )
+        )
+    db_session.add_all(reviews)
+    db_session.commit()
+    rebuild_statistics(db_session, user.id)
+
+    res = await user_client.get("/stats")
+    assert res.status_code == 200
+    stats = res.json()
+
+    review_dates = [review.reviewed_at for review in reviews]
+    assert stats["total_reviews"] == len(reviews)
+    assert stats["daily_reviews"] == calculate_daily_reviews(review_dates)
+    assert stats["streak"] == calculate_streak(datetime(2025, 7, 10), review_dates)
+    assert stats["streak"] == 3
+    assert stats["success_rate"] == round(calculate_success_rate(reviews), 2)
+    assert stats["retention_rate"] == round(calculate_retention_rate(reviews), 2)
+
+    reviews.sort(key=lambda review: review.reviewed_at)
+    for deck_statistics in get_decks_statistics([deck_1, deck_2], reviews):
+        expected = deck_statistics.model_dump(mode="json")
+        expected["last_studied"] = expected["last_studied"].replace("+00:00", "Z")
+
+        res = await user_client.get(f"/stats/{deck_statistics.deck_id}")
+        assert res.json() == expected
+        assert expected in stats["deck_statistics"]
+
+
+async def test_statistics_rollups_consistency(db_session, user, user_client):
+    res = await user_client.post("/decks", json={"name": "deck"})
+    deck_id = res.json()["id"]
+    res = await user_client.post(
+        "/cards", json={"deck_id": deck_id, "content": "Test card"}
+    )
+    card_id = res.json()["id"]
+
+    feedbacks = [ReviewFeedback.OK, ReviewFeedback.FORGOT, ReviewFeedback.SKIPPED]
+    for i in range(12):
+        res = await user_client.post(
+            "/reviews", json={"card_id": card_id, "feedback": feedbacks[i % 3]}
+        )
+        assert res.status_code == 201
+
+    assert not find_statistics_drift(db_session).drifted
+
+    db_session.query(UserDayStatistics).update({"total": UserDayStatistics.total + 1})
+    db_session.query(DeckReviewStatistics).update({"recent_feedback": []})
+    db_session.commit()
+
+    drift = find_statistics_drift(db_session, user.id)
+    assert drift.drifted
+    assert drift.day_rows == 2
+    assert drift.deck_rows == 2
+
+    rebuild_statistics(db_session, user.id)
+    assert not find_statistics_drift(db_session).drifted
+
+    rollup = db_session.get(DeckReviewStatistics, deck_id)
+    assert rollup.total == 12
+    assert len(rollup.recent_feedback) == RECENT_REVIEWS_WINDOW
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+from src.db.models import Card
+
+
+async def create_deck(client, name, **fields):
+    res = await client.post("/decks", json={"name": name})
+    deck_id = res.json()["id"]
+    if fields:
+        await client.patch(f"/decks/{deck_id}", json=fields)
+    return deck_id
+
+
+async def create_card(db_session, client, deck_id, content, due_in_days):
+    res = await client.post("/cards", json={"deck_id": deck_id, "content": content})
+    card = Card.get(db_session, res.json()["id"])
+    card.next_review_date = datetime.now(timezone.utc) + timedelta(days=due_in_days)
+    card.save(db_session)
+    return card
+
+
+async def test_get_study_queue_interleaves_decks(db_session, user, user_client):
+    deck_1_id = await create_deck(user_client, "deck 1")
+    deck_2_id = await create_deck(user_client, "deck 2")
+    paused_deck_id = await create_deck(user_client, "paused", is_paused=True)
+    archived_deck_id = await create_deck(user_client, "archived", is_archived=True)
+
+    for i in range(3):
+        await create_card(
+            db_session, user_client, deck_1_id, f"deck 1 card {i}", -10 + i
+        )
+    for i in range(2):
+        await create_card(
+            db_session, user_client, deck_2_id, f"deck 2 card {i}", -5 + i
+        )
+    await create_card(db_session, user_client, deck_2_id, "not due", 3)
+    await create_card(db_session, user_client, paused_deck_id, "paused", -20)
+    await create_card(db_session, user_client, archived_deck_id, "archived", -20)
+
+    res = await user_client.get("/study/queue", params={"limit": 4})
+    assert res.status_code == 200
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == [
+        "deck 1 card 0",
+        "deck 2 card 0",
+        "deck 1 card 1",
+        "deck 2 card 1",
+    ]
+    assert queue["cards"][0]["deck_name"] == "deck 1"
+    assert queue["due_count"] == 5
+    assert not queue["due_count_capped"]
+
+    res = await user_client.get("/study/queue", params={"deck_id": deck_2_id})
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == [
+        "deck 2 card 0",
+        "deck 2 card 1",
+    ]
+    assert queue["due_count"] == 2
+
+
+async def test_get_study_queue_by_category(db_session, user, user_client):
+    res = await user_client.post("/categories", json={"name": "category"})
+    category_id = res.json()["id"]
+    res = await user_client.post(
+        "/decks", json={"name": "deck 1", "category_id": category_id}
+    )
+    deck_1_id = res.json()["id"]
+    deck_2_id = await create_deck(user_client, "deck 2")
+
+    await create_card(db_session, user_client, deck_1_id, "in category", -1)
+    await create_card(db_session, user_client, deck_2_id, "not in category", -2)
+
+    res = await user_client.get("/study/queue", params={"category_id": category_id})
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == ["in category"]
+    assert queue["due_count"] == 1
+
+
+async def test_get_study_queue_include_subcategories(db_session, user, user_client):
+    res = await user_client.post("/categories", json={"name": "category"})
+    category_id = res.json()["id"]
+    res = await user_client.post(
+        "/categories", json={"name": "subcategory", "parent_id": category_id}
+    )
+    subcategory_id = res.json()["id"]
+    res = await user_client.post(
+        "/decks", json={"name": "deck 1", "category_id": category_id}
+    )
+    deck_1_id = res.json()["id"]
+    res = await user_client.post(
+        "/decks", json={"name": "deck 2", "category_id": subcategory_id}
+    )
+    deck_2_id = res.json()["id"]
+    deck_3_id = await create_deck(user_client, "deck 3")
+
+    await create_card(db_session, user_client, deck_1_id, "in category", -1)
+    await create_card(db_session, user_client, deck_2_id, "in subcategory", -2)
+    await create_card(db_session, user_client, deck_3_id, "not in category", -3)
+
+    res = await user_client.get("/study/queue", params={"category_id": category_id})
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == ["in category"]
+
+    res = await user_client.get(
+        "/study/queue",
+        params={"category_id": category_id, "include_subcategories": True},
+    )
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == [
+        "in subcategory",
+        "in category",
+    ]
+    assert queue["due_count"] == 2
+
+
+async def test_get_study_queue_other_user(db_session, user, admin_client, user_client):
+    deck_id = await create_deck(admin_client, "deck")
+    await create_card(db_session, admin_client, deck_id, "admin card", -1)
+
+    res = await user_client.get("/study/queue", params={"deck_id": deck_id})
+    assert res.json() == {"cards": [], "due_count": 0, "due_count_capped": False}
+
+
+async def test_get_study_queue_due_count_capped(
+    monkeypatch, db_session, user, user_client
+):
+    monkeypatch.setattr("src.api.study.STUDY_QUEUE_DUE_COUNT_CAP", 2)
+    deck_id = await create_deck(user_client, "deck")
+    for i in range(4):
+        await create_card(db_session, user_client, deck_id, f"card {i}", -i - 1)
+
+    res = await user_client.get("/study/queue", params={"limit": 1})
+    queue = res.json()
+    assert [card["content"] for card in queue["cards"]] == ["card 3"]
+    assert queue["due_count"] == 2
+    assert queue["due_count_capped"]
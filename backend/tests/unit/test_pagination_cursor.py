@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.db.models import Card, User
+from src.pagination import SortKey
+
+
+def test_sort_key_decodes_cursor_values():
+    created_at = datetime(2025, 7, 1, 8, tzinfo=timezone.utc)
+    card_id = uuid4()
+
+    assert SortKey(Card.created_at.desc()).decode(created_at.isoformat()) == created_at
+    assert SortKey(Card.id).decode(str(card_id)) == card_id
+    assert SortKey(User.email).decode("user@domain.com") == "user@domain.com"
+    assert SortKey(Card.interval).decode(3) == 3
+
+
+@pytest.mark.parametrize(
+    "order_by, value",
+    [
+        (Card.created_at, 5),
+        (Card.created_at, None),
+        (Card.id, 5),
+        (Card.id, {"a": 1}),
+        (User.email, {"a": 1}),
+        (User.email, ["a"]),
+        (Card.interval, "3"),
+        (Card.interval, True),
+        (Card.interval, None),
+    ],
+)
+def test_sort_key_rejects_cursor_values_of_wrong_type(order_by, value):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        SortKey(order_by).decode(value)
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.auth import passwords
+from src.auth.passwords import (
+    PasswordHasher,
+    check_password,
+    hash_password,
+    needs_rehash,
+)
+from src.exceptions import PasswordHashingBusyError
+
+
+def test_hash_password_uses_configured_cost(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    password_hash = hash_password("password")
+
+    assert password_hash.startswith("$2b$04$")
+    assert check_password("password", password_hash)
+    assert not check_password("wrong", password_hash)
+    assert not needs_rehash(password_hash)
+
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    assert needs_rehash(password_hash)
+
+
+async def test_password_hasher_rejects_work_past_queue_size():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(hasher.run(release.wait))
+    queued = asyncio.ensure_future(hasher.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingBusyError):
+        await hasher.run(lambda: "rejected")
+
+    release.set()
+    assert await running
+    assert await queued == "queued"
+    # Finished work frees its slot
+    assert await hasher.run(lambda: "accepted") == "accepted"
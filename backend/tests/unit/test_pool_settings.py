@@ -0,0 +1,55 @@
+from src.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    PoolSettings,
+)
+
+
+def test_pool_settings_defaults(monkeypatch):
+    for name in [
+        "DB_POOL_SIZE",
+        "DB_MAX_OVERFLOW",
+        "DB_POOL_TIMEOUT",
+        "DB_POOL_RECYCLE",
+        "DB_POOL_PRE_PING",
+        "DB_PGBOUNCER",
+    ]:
+        monkeypatch.delenv(name, raising=False)
+
+    assert PoolSettings.from_env() == PoolSettings()
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "300")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("DB_PGBOUNCER", "1")
+
+    settings = PoolSettings.from_env()
+    assert settings == PoolSettings(
+        size=20, max_overflow=0, timeout=2.5, recycle=300, pre_ping=True, pgbouncer=True
+    )
+
+    kwargs = settings.engine_kwargs()
+    assert kwargs["poolclass"] is InstrumentedQueuePool
+    assert kwargs["pool_size"] == 20
+    assert kwargs["max_overflow"] == 0
+    assert kwargs["pool_timeout"] == 2.5
+    assert kwargs["pool_recycle"] == 300
+    assert kwargs["pool_pre_ping"]
+    # psycopg2 doesn't use server-side prepared statements
+    assert "connect_args" not in kwargs
+
+
+def test_pool_settings_pgbouncer_disables_prepared_statements():
+    kwargs = PoolSettings(pgbouncer=True).engine_kwargs(is_async=True)
+    assert kwargs["poolclass"] is InstrumentedAsyncQueuePool
+    assert kwargs["connect_args"]["statement_cache_size"] == 0
+    assert kwargs["connect_args"]["prepared_statement_cache_size"] == 0
+
+    name_func = kwargs["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+    assert "connect_args" not in PoolSettings().engine_kwargs(is_async=True)
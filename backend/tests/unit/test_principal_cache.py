@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+from src.auth.principal import Principal, PrincipalCache
+from src.db.models import UserRole
+
+
+def make_principal(token_version: int = 0) -> Principal:
+    return Principal(id=uuid4(), role=UserRole.USER, token_version=token_version)
+
+
+def test_principal_cache_get():
+    cache = PrincipalCache()
+    principal = make_principal(token_version=1)
+    cache.add(principal)
+
+    assert cache.get(principal.id, 1) == principal
+    assert cache.get(principal.id, 0) is None
+    assert cache.get(uuid4(), 1) is None
+    # A stale token doesn't evict the current principal
+    assert cache.get(principal.id, 1) == principal
+
+
+def test_principal_cache_evicts_least_recently_used():
+    cache = PrincipalCache(maxsize=2)
+    first, second, third = [make_principal() for _ in range(3)]
+    cache.add(first)
+    cache.add(second)
+    cache.get(first.id, 0)
+    cache.add(third)
+
+    assert len(cache) == 2
+    assert cache.get(first.id, 0) == first
+    assert cache.get(second.id, 0) is None
+    assert cache.get(third.id, 0) == third
+
+
+def test_principal_cache_expires_entries():
+    cache = PrincipalCache(ttl=0)
+    principal = make_principal()
+    cache.add(principal)
+
+    assert cache.get(principal.id, 0) is None
+    assert len(cache) == 0
+
+
+def test_principal_cache_invalidate():
+    cache = PrincipalCache()
+    principal = make_principal()
+    cache.add(principal)
+    cache.invalidate(principal.id)
+    cache.invalidate(uuid4())
+
+    assert cache.get(principal.id, 0) is None
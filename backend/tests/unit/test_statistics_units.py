@@ -3,7 +3,7 @@ from uuid import uuid4
 
 import pytest
 
-from src.db.models import Review, ReviewFeedback
+from src.db.models import Deck, Review, ReviewFeedback
 from src.statistics import (
     DifficultyRankings,
     calculate_daily_reviews,
@@ -11,13 +11,14 @@ from src.statistics import (
     calculate_streak,
     calculate_success_rate,
     classify_deck_difficulty,
+    get_decks_statistics,
 )
 
 
-def create_review(feedback: ReviewFeedback, interval: int):
+def create_review(feedback: ReviewFeedback, interval: int, deck_id=None):
     return Review(
         card_id=uuid4(),
-        deck_id=uuid4(),
+        deck_id=deck_id or uuid4(),
         user_id=uuid4(),
         reviewed_at=datetime.now(timezone.utc),
         card_content="",
@@ -194,3 +195,22 @@ def test_calculate_success_rate(reviews, expected_success_rate):
 )
 def test_classify_deck_difficulty(reviews, expected_difficulty_ranking):
     assert classify_deck_difficulty(reviews) == expected_difficulty_ranking
+
+
+def test_get_decks_statistics():
+    decks = [Deck(id=uuid4(), name=f"deck {i}") for i in range(3)]
+    reviews = [
+        create_review(feedback=ReviewFeedback.OK, interval=25, deck_id=decks[0].id)
+        for _ in range(5)
+    ] + [
+        create_review(feedback=ReviewFeedback.FORGOT, interval=25, deck_id=decks[1].id)
+    ]
+
+    deck_statistics = get_decks_statistics(decks, reviews)
+
+    assert [ds.deck_name for ds in deck_statistics] == ["deck 0", "deck 1", "deck 2"]
+    assert [ds.total_reviews for ds in deck_statistics] == [5, 1, 0]
+    assert [ds.retention_rate for ds in deck_statistics] == [1.0, 0.0, 0.0]
+    assert deck_statistics[0].difficulty_ranking == DifficultyRankings.MASTERED
+    assert deck_statistics[2].difficulty_ranking == DifficultyRankings.NEW
+    assert deck_statistics[2].last_studied is None
@@ -0,0 +1,55 @@
+import time
+
+from src.auth.token_cache import VerifiedTokenCache
+
+
+def test_token_cache_get():
+    cache = VerifiedTokenCache()
+    claims = {"sub": "user", "exp": time.time() + 60}
+    cache.add("token", claims)
+
+    assert cache.get("token") == claims
+    assert cache.get("other token") is None
+    assert cache.metrics.hits == 1
+    assert cache.metrics.misses == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_token_cache_returns_copies():
+    cache = VerifiedTokenCache()
+    cache.add("token", {"sub": "user"})
+    cache.get("token")["sub"] = "someone else"
+
+    assert cache.get("token") == {"sub": "user"}
+
+
+def test_token_cache_expires_entries_at_exp():
+    cache = VerifiedTokenCache()
+    cache.add("expired", {"sub": "user", "exp": time.time() - 1})
+    cache.add("no exp", {"sub": "user"})
+
+    assert cache.get("expired") is None
+    assert cache.get("no exp") == {"sub": "user"}
+    assert cache.metrics.expired == 1
+    assert len(cache) == 1
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = VerifiedTokenCache(maxsize=2)
+    for token in ["first", "second"]:
+        cache.add(token, {"sub": token})
+    cache.get("first")
+    cache.add("third", {"sub": "third"})
+
+    assert cache.get("first") is not None
+    assert cache.get("second") is None
+    assert cache.get("third") is not None
+    assert cache.metrics.evictions == 1
+
+
+def test_token_cache_disabled():
+    cache = VerifiedTokenCache(maxsize=0)
+    cache.add("token", {"sub": "user"})
+
+    assert cache.get("token") is None
+    assert len(cache) == 0